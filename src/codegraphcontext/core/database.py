@@ -43,6 +43,9 @@ class DatabaseManager:
         self.neo4j_uri = os.getenv('NEO4J_URI')
         self.neo4j_username = os.getenv('NEO4J_USERNAME', 'neo4j')
         self.neo4j_password = os.getenv('NEO4J_PASSWORD')
+        # Connection pool settings; the defaults leave headroom for parallel indexing.
+        self.max_connection_pool_size = int(os.getenv('NEO4J_MAX_CONNECTION_POOL_SIZE', max(50, 2 * (os.cpu_count() or 1))))
+        self.connection_acquisition_timeout = float(os.getenv('NEO4J_CONNECTION_ACQUISITION_TIMEOUT', 60))
         self._initialized = True
 
     def get_driver(self) -> Driver:
@@ -71,7 +74,10 @@ class DatabaseManager:
                     logger.info(f"Creating Neo4j driver connection to {self.neo4j_uri}")
                     self._driver = GraphDatabase.driver(
                         self.neo4j_uri,
-                        auth=(self.neo4j_username, self.neo4j_password)
+                        auth=(self.neo4j_username, self.neo4j_password),
+                        max_connection_pool_size=self.max_connection_pool_size,
+                        connection_acquisition_timeout=self.connection_acquisition_timeout,
+                        keep_alive=True,
                     )
                     # Test the connection immediately to fail fast if credentials are wrong.
                     try:
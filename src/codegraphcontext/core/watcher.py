@@ -10,6 +10,8 @@ import typing
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from codegraphcontext.utils.source_files import iter_source_files
+
 if typing.TYPE_CHECKING:
     from codegraphcontext.tools.graph_builder import GraphBuilder
     from codegraphcontext.core.jobs import JobManager
@@ -52,14 +54,13 @@ class RepositoryEventHandler(FileSystemEventHandler):
     def _initial_scan(self):
         """Scans the entire repository, parses all files, and builds the initial graph."""
         logger.info(f"Performing initial scan for watcher: {self.repo_path}")
-        all_files = list(self.repo_path.rglob("*.py"))
+        all_files = list(iter_source_files(self.repo_path, {'.py'}))
         
         # 1. Pre-scan all files to get a global map of where every symbol is defined.
         self.imports_map = self.graph_builder._pre_scan_for_imports(all_files)
         
         # 2. Parse all files in detail and cache the parsed data.
-        for f in all_files:
-            parsed_data = self.graph_builder.parse_python_file(self.repo_path, f, self.imports_map)
+        for parsed_data in self.graph_builder.parse_files_parallel(self.repo_path, all_files):
             if "error" not in parsed_data:
                 self.all_file_data.append(parsed_data)
         
@@ -90,8 +91,7 @@ class RepositoryEventHandler(FileSystemEventHandler):
         modified_path = Path(event_path_str)
 
         # 1. Get all supported files in the repository.
-        supported_extensions = self.graph_builder.parsers.keys()
-        all_files = [f for f in self.repo_path.rglob("*") if f.is_file() and f.suffix in supported_extensions]
+        all_files = list(iter_source_files(self.repo_path, self.graph_builder.parsers.keys()))
 
         # 2. Re-scan all files to get a fresh, global map of all symbols.
         self.imports_map = self.graph_builder._pre_scan_for_imports(all_files)
@@ -106,8 +106,7 @@ class RepositoryEventHandler(FileSystemEventHandler):
         # 4. Re-parse all files to have a complete, in-memory representation for the linking pass.
         # This is necessary because a change in one file can affect relationships in others.
         self.all_file_data = []
-        for f in all_files:
-            parsed_data = self.graph_builder.parse_file(self.repo_path, f)
+        for parsed_data in self.graph_builder.parse_files_parallel(self.repo_path, all_files):
             if "error" not in parsed_data:
                 self.all_file_data.append(parsed_data)
         logger.info("Refreshed in-memory cache of all file data.")
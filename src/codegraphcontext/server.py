@@ -544,51 +544,13 @@ class MCPServer:
             return {"error": f"Failed to start watching directory: {str(e)}"}        
     def list_imports_tool(self, **args) -> Dict[str, Any]:
         """Tool to list all imports from code files"""        
-        path = args.get("path")
-        language = args.get("language", "python")
-        recursive = args.get("recursive", True)
-        all_imports = set()
-        file_extensions = {
-            'python': ['.py'], 'javascript': ['.js', '.jsx', '.mjs'],
-            'typescript': ['.ts', '.tsx'], 'java': ['.java'],
-        }
-        
-        extensions = file_extensions.get(language, ['.py'])
-        extract_func = {
-            'python': self.import_extractor.extract_python_imports,
-            'javascript': self.import_extractor.extract_javascript_imports,
-            'typescript': self.import_extractor.extract_javascript_imports,
-            'java': self.import_extractor.extract_java_imports,
-        }.get(language, self.import_extractor.extract_python_imports)
-        
-        try:
-            path_obj = Path(path)
-            
-            if path_obj.is_file():
-                if any(str(path_obj).endswith(ext) for ext in extensions):
-                    all_imports.update(extract_func(str(path_obj)))
-            elif path_obj.is_dir():
-                pattern = "**/*" if recursive else "*"
-                for ext in extensions:
-                    for file_path in path_obj.glob(f"{pattern}{ext}"):
-                        if file_path.is_file():
-                            all_imports.update(extract_func(str(file_path)))
-            else:
-                return {"error": f"Path {path} does not exist"}
-            
-            # Removed standard library filtering as per user request.
-            # if language == 'python':
-            #     # Get the list of stdlib modules for the current Python version
-            #     stdlib_modules = set(stdlibs.module_names)
-            #     all_imports = all_imports - stdlib_modules
-            
-            return {
-                "imports": sorted(list(all_imports)), "language": language,
-                "path": path, "count": len(all_imports)
-            }
-        
-        except Exception as e:
-            return {"error": f"Failed to analyze imports: {str(e)}"}
+        # Standard library modules are kept in the listing as per user request.
+        return self.import_extractor.list_imports_tool(
+            args.get("path"),
+            language=args.get("language", "python"),
+            recursive=args.get("recursive", True),
+            exclude_stdlib=False,
+        )
     
     def add_code_to_graph_tool(self, **args) -> Dict[str, Any]:
         """
@@ -620,13 +582,15 @@ class MCPServer:
                     }
             
             # Estimate time and create a job for the user to track.
-            total_files, estimated_time = self.graph_builder.estimate_processing_time(path_obj)
+            # The directory is walked once; the build reuses the listing used for the estimate.
+            files = self.graph_builder.find_source_files(path_obj, is_dependency)
+            total_files, estimated_time = self.graph_builder.estimate_processing_time(path_obj, files)
             job_id = self.job_manager.create_job(str(path_obj), is_dependency)
             self.job_manager.update_job(job_id, total_files=total_files, estimated_duration=estimated_time)
             
             # Create the coroutine for the background task and schedule it on the main event loop.
             coro = self.graph_builder.build_graph_from_path_async(
-                path_obj, is_dependency, job_id
+                path_obj, is_dependency, job_id, files=files
             )
             asyncio.run_coroutine_threadsafe(coro, self.loop)
             
@@ -670,14 +634,15 @@ class MCPServer:
             
             path_obj = Path(package_path)
             
-            total_files, estimated_time = self.graph_builder.estimate_processing_time(path_obj)
+            files = self.graph_builder.find_source_files(path_obj, is_dependency)
+            total_files, estimated_time = self.graph_builder.estimate_processing_time(path_obj, files)
             
             job_id = self.job_manager.create_job(package_path, is_dependency)
             
             self.job_manager.update_job(job_id, total_files=total_files, estimated_duration=estimated_time)
             
             coro = self.graph_builder.build_graph_from_path_async(
-                path_obj, is_dependency, job_id
+                path_obj, is_dependency, job_id, files=files
             )
             asyncio.run_coroutine_threadsafe(coro, self.loop)
             
@@ -1,16 +1,29 @@
 
 # src/codegraphcontext/tools/graph_builder.py
 import asyncio
+import hashlib
 import logging
+import multiprocessing
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Coroutine, Dict, Optional, Tuple
+from typing import Any, Collection, Coroutine, Dict, Iterator, Optional, Tuple
 from datetime import datetime
 import ast
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import repeat
 
 from ..core.database import DatabaseManager
 from ..core.jobs import JobManager, JobStatus
 from ..utils.debug_log import debug_log
+from ..utils.parse_cache import ParseCache, open_parse_cache
+from ..utils.source_files import iter_source_files
+from .languages.python import BUILTIN_NAMES, PythonTreeSitterParser, pre_scan_python
+from .languages.javascript import JavascriptTreeSitterParser, pre_scan_javascript
 
 # New imports for tree-sitter
 from tree_sitter import Language, Parser
@@ -22,10 +35,162 @@ logger = logging.getLogger(__name__)
 # Set to 1 to enable, 0 to disable.
 debug_mode = 0
 
+# Constraints and indexes are sent together in a single write transaction; if that
+# fails, each is retried on its own so one bad statement cannot drop all the others.
+SCHEMA_STATEMENTS: tuple[str, ...] = (
+    "CREATE CONSTRAINT repository_path IF NOT EXISTS FOR (r:Repository) REQUIRE r.path IS UNIQUE",
+    "CREATE CONSTRAINT file_path IF NOT EXISTS FOR (f:File) REQUIRE f.path IS UNIQUE",
+    "CREATE CONSTRAINT directory_path IF NOT EXISTS FOR (d:Directory) REQUIRE d.path IS UNIQUE",
+    "CREATE CONSTRAINT function_unique IF NOT EXISTS FOR (f:Function) REQUIRE (f.name, f.file_path, f.line_number) IS UNIQUE",
+    "CREATE CONSTRAINT class_unique IF NOT EXISTS FOR (c:Class) REQUIRE (c.name, c.file_path, c.line_number) IS UNIQUE",
+    "CREATE CONSTRAINT variable_unique IF NOT EXISTS FOR (v:Variable) REQUIRE (v.name, v.file_path, v.line_number) IS UNIQUE",
+    "CREATE CONSTRAINT module_name IF NOT EXISTS FOR (m:Module) REQUIRE m.name IS UNIQUE",
+
+    # Parameters are merged on their owning function's key, and CONTAINS/CALLS
+    # lookups match functions and classes by name within a file.
+    "CREATE INDEX parameter_key IF NOT EXISTS FOR (p:Parameter) ON (p.name, p.file_path, p.function_line_number)",
+    "CREATE INDEX function_name_file IF NOT EXISTS FOR (f:Function) ON (f.name, f.file_path)",
+    "CREATE INDEX class_name_file IF NOT EXISTS FOR (c:Class) ON (c.name, c.file_path)",
+
+    # Indexes for language attribute
+    "CREATE INDEX function_lang IF NOT EXISTS FOR (f:Function) ON (f.lang)",
+    "CREATE INDEX class_lang IF NOT EXISTS FOR (c:Class) ON (c.lang)",
+)
+
+# Created in its own transaction: editions and versions without multi-label
+# `FOR (n:A|B)` syntax reject it, and the MERGE write path does not need it.
+FULLTEXT_INDEX_STATEMENT = """
+    CREATE FULLTEXT INDEX code_search_index IF NOT EXISTS
+    FOR (n:Function|Class|Variable)
+    ON EACH [n.name, n.source, n.docstring]
+"""
+
+# Files larger than this are almost always generated or bundled code and are not parsed.
+MAX_FILE_SIZE = 2_000_000
+
+# Upper bound on rows sent in a single UNWIND statement.
+WRITE_BATCH_SIZE = 1000
+# Parsed files written, and committed, together while building a repository.
+FILES_PER_TRANSACTION = 50
+# Parsed files that may wait for the writer before parsing is held back.
+WRITE_QUEUE_SIZE = 256
+# CALLS and INHERITS rows are small and gathered across the whole repository,
+# so they are sent in larger chunks and committed every ROWS_PER_TRANSACTION rows.
+CALLS_BATCH_SIZE = 5000
+ROWS_PER_TRANSACTION = 1000
+
+def _batched(rows: list, size: int = WRITE_BATCH_SIZE):
+    """Yields consecutive slices of at most `size` rows."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+# Repository-wide relationship writes commit in server-side chunks via
+# CALL { ... } IN TRANSACTIONS, which bounds Neo4j's transaction memory. Such
+# statements must run as auto-commit queries (session.run), not in execute_write.
+# A call site is identified by its line and call text; `args` is set rather than
+# merged on, so edges written before the argument format changed are updated in place.
+CALLS_FROM_FUNCTION_QUERY = f"""
+    UNWIND $rows AS row
+    CALL {{
+        WITH row
+        MATCH (caller:Function {{name: row.caller_name, file_path: row.caller_file_path, line_number: row.caller_line_number}})
+        MATCH (called:Function {{name: row.called_name, file_path: row.called_file_path}})
+        MERGE (caller)-[r:CALLS {{line_number: row.line_number, full_call_name: row.full_call_name}}]->(called)
+        SET r.args = row.args
+    }} IN TRANSACTIONS OF {ROWS_PER_TRANSACTION} ROWS
+"""
+
+CALLS_FROM_FILE_QUERY = f"""
+    UNWIND $rows AS row
+    CALL {{
+        WITH row
+        MATCH (caller:File {{path: row.caller_file_path}})
+        MATCH (called:Function {{name: row.called_name, file_path: row.called_file_path}})
+        MERGE (caller)-[r:CALLS {{line_number: row.line_number, full_call_name: row.full_call_name}}]->(called)
+        SET r.args = row.args
+    }} IN TRANSACTIONS OF {ROWS_PER_TRANSACTION} ROWS
+"""
+
+INHERITS_QUERY = f"""
+    UNWIND $rows AS row
+    CALL {{
+        WITH row
+        MATCH (child:Class {{name: row.child_name, file_path: row.file_path}})
+        MATCH (parent:Class {{name: row.parent_name, file_path: row.parent_file_path}})
+        MERGE (child)-[:INHERITS]->(parent)
+    }} IN TRANSACTIONS OF {ROWS_PER_TRANSACTION} ROWS
+"""
+
+# Finds which files of a batch are already stored from the same contents by the
+# same parsers; a missing content hash never matches.
+UNCHANGED_FILES_QUERY = """
+    UNWIND $files AS file
+    MATCH (f:File {path: file.path})
+    WHERE f.content_sha = file.content_sha
+      AND f.parser_version = $parser_version
+      AND f.is_dependency = file.is_dependency
+    RETURN f.path AS path
+"""
+
+# Writes a file's missing ancestor directories, outermost first, in one statement.
+# Every directory is merged before any parent is looked up, so a parent created
+# earlier in the same chain is found; the first parent may be the Repository.
+DIRECTORY_CHAIN_QUERY = """
+    UNWIND $dirs AS dir
+    MERGE (d:Directory {path: dir.path})
+    SET d.name = dir.name
+    WITH d, dir
+    OPTIONAL MATCH (r:Repository {path: dir.parent_path})
+    OPTIONAL MATCH (pd:Directory {path: dir.parent_path})
+    WITH d, coalesce(r, pd) AS p
+    WHERE p IS NOT NULL
+    MERGE (p)-[:CONTAINS]->(d)
+"""
+
+# Cypher that would otherwise interpolate a label is kept as one constant per
+# label, so every statement sent is one of a fixed set and its plan is cached.
+FILE_CONTAINS_QUERIES: Dict[str, str] = {
+    parent_label: f"""
+        MATCH (p:{parent_label} {{path: $parent_path}})
+        MATCH (f:File {{path: $file_path}})
+        MERGE (p)-[:CONTAINS]->(f)
+    """
+    for parent_label in ('Repository', 'Directory')
+}
+
+# Nodes from dependency code also carry a :Dependency label, so queries can select
+# or exclude third-party code by label instead of filtering on a property. The
+# clause is chosen per file, and a re-indexed first-party file drops the label.
+DEPENDENCY_LABEL_CLAUSES: Dict[bool, str] = {
+    True: "SET n:Dependency",
+    False: "REMOVE n:Dependency",
+}
+
+ITEM_MERGE_QUERIES: Dict[Tuple[str, bool], str] = {
+    (label, is_dependency): f"""
+        MATCH (f:File {{path: $file_path}})
+        UNWIND $items AS item
+        MERGE (n:{label} {{name: item.name, file_path: $file_path, line_number: item.line_number}})
+        SET n += item, n.lang = $lang, n.is_dependency = $is_dependency
+        {label_clause}
+        MERGE (f)-[:CONTAINS]->(n)
+    """
+    for label in ('Function', 'Class', 'Variable')
+    for is_dependency, label_clause in DEPENDENCY_LABEL_CLAUSES.items()
+}
+
+
+# Language name -> language-specific parser class, looked up once per TreeSitterParser.
+LANGUAGE_PARSERS: Dict[str, type] = {
+    'python': PythonTreeSitterParser,
+    'javascript': JavascriptTreeSitterParser,
+}
 
 class TreeSitterParser:
     """A generic parser wrapper for a specific language using tree-sitter."""
 
+    __slots__ = ('language_name', 'language', 'parser', 'language_specific_parser')
+
     def __init__(self, language_name: str):
         self.language_name = language_name
         self.language: Language = get_language(language_name)
@@ -33,12 +198,9 @@ class TreeSitterParser:
         self.parser.set_language(self.language)
 
         self.language_specific_parser = None
-        if self.language_name == 'python':
-            from .languages.python import PythonTreeSitterParser
-            self.language_specific_parser = PythonTreeSitterParser(self)
-        elif self.language_name == 'javascript':
-            from .languages.javascript import JavascriptTreeSitterParser
-            self.language_specific_parser = JavascriptTreeSitterParser(self)
+        parser_class = LANGUAGE_PARSERS.get(self.language_name)
+        if parser_class:
+            self.language_specific_parser = parser_class(self)
 
     def parse(self, file_path: Path, is_dependency: bool = False) -> Dict:
         """Dispatches parsing to the language-specific parser."""
@@ -47,6 +209,120 @@ class TreeSitterParser:
         else:
             raise NotImplementedError(f"No language-specific parser implemented for {self.language_name}")
 
+# File extension -> tree-sitter language name for every supported parser.
+PARSER_LANGUAGES: Dict[str, str] = {
+    '.py': 'python',
+    '.js': 'javascript',
+}
+
+# File extension -> pre-scan function collecting that language's definitions.
+PRE_SCANNERS = {
+    '.py': pre_scan_python,
+    '.js': pre_scan_javascript,
+}
+
+# The pre-scan of a language is split across the parse pool in chunks of this many
+# files; with fewer than PARALLEL_PRE_SCAN_MIN_FILES it runs in-process instead.
+PRE_SCAN_CHUNK_SIZE = 64
+PARALLEL_PRE_SCAN_MIN_FILES = 32
+
+# Parse workers are started by a fork server (spawned where that is unavailable),
+# never forked from the server process itself: it runs threads, and a forked child
+# would inherit their locks and open connections mid-use.
+PARSE_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+def _local_import_paths(file_data: Dict) -> Dict[str, str]:
+    """
+    Maps each name a file imports (its alias, or the last dotted part) to the
+    imported module as a path fragment, e.g. `pkg/mod`, for matching candidate
+    file paths. Converted once per file rather than once per candidate path.
+    """
+    return {imp.get('alias') or imp['name'].split('.')[-1]: imp['name'].replace('.', '/')
+            for imp in file_data.get('imports', [])}
+
+@lru_cache(maxsize=None)
+def _parser_version() -> str:
+    """
+    Fingerprints the language parsers and the interpreter's minor version, so
+    cached results are dropped when either changes.
+    """
+    digest = hashlib.sha1(f"{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    for module_path in sorted((Path(__file__).parent / 'languages').glob('*.py')):
+        digest.update(module_path.read_bytes())
+    return digest.hexdigest()
+
+# Opened on first use; False records that the cache is unavailable. A copy inherited
+# by a forked worker reconnects on its first lookup (see ParseCache._check_owner).
+_parse_cache = None
+
+def _get_parse_cache() -> Optional[ParseCache]:
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = open_parse_cache(_parser_version()) or False
+    return _parse_cache or None
+
+def _parse_with(parser: TreeSitterParser, repo_path: Path, file_path: Path, is_dependency: bool = False) -> Dict:
+    """
+    Parses one file with `parser`, returning its data or an `error` entry.
+    The path is resolved here once, so `file_data['file_path']` is always absolute
+    and the graph writers can use it without touching the filesystem again.
+    Unchanged files are served from the on-disk parse cache.
+    """
+    file_path = file_path.resolve()
+    try:
+        # Taken before the file is read, so a save during parsing is not cached as current.
+        stat = file_path.stat()
+    except OSError as e:
+        return {"file_path": str(file_path), "error": str(e)}
+    size = stat.st_size
+    if size > MAX_FILE_SIZE:
+        logger.warning(f"Skipping {file_path}: {size} bytes exceeds the {MAX_FILE_SIZE} byte limit")
+        return {"file_path": str(file_path), "error": "File too large"}
+
+    cache = _get_parse_cache()
+    if cache:
+        file_data = cache.get(file_path, is_dependency)
+        if file_data is not None:
+            file_data['repo_path'] = str(repo_path)
+            return file_data
+
+    if debug_mode:
+        debug_log("[parse_file] Starting parsing for: %s with %s parser", file_path, parser.language_name)
+    try:
+        file_data = parser.parse(file_path, is_dependency)
+        if cache:
+            cache.put(file_path, is_dependency, file_data, file_data.get('content_sha'), stat)
+        file_data['repo_path'] = str(repo_path)
+        if debug_mode:
+            debug_log("[parse_file] Successfully parsed: %s", file_path)
+        return file_data
+    except Exception as e:
+        logger.error(f"Error parsing {file_path} with {parser.language_name} parser: {e}")
+        if debug_mode:
+            debug_log("[parse_file] Error parsing %s: %s", file_path, e)
+        return {"file_path": str(file_path), "error": str(e)}
+
+# Parsers owned by a worker process. tree-sitter objects cannot be pickled, so
+# each worker builds its own on first use and keeps them for later files.
+_worker_parsers: Dict[str, TreeSitterParser] = {}
+
+def _get_worker_parser(suffix: str) -> TreeSitterParser:
+    parser = _worker_parsers.get(suffix)
+    if parser is None:
+        parser = _worker_parsers[suffix] = TreeSitterParser(PARSER_LANGUAGES[suffix])
+    return parser
+
+def _parse_file_worker(repo_path: Path, file_path: Path, is_dependency: bool = False) -> Dict:
+    """Process-pool entry point: parses one file with this worker's parser."""
+    return _parse_with(_get_worker_parser(file_path.suffix), repo_path, file_path, is_dependency)
+
+def _pre_scan_worker(suffix: str, files: list[Path]) -> dict:
+    """Process-pool entry point: pre-scans a chunk of files of one language."""
+    return PRE_SCANNERS[suffix](files, _get_worker_parser(suffix))
+
+
 class GraphBuilder:
     """Module for building and managing the Neo4j code graph."""
 
@@ -55,38 +331,38 @@ class GraphBuilder:
         self.job_manager = job_manager
         self.loop = loop
         self.driver = self.db_manager.get_driver()
-        self.parsers = {
-            '.py': TreeSitterParser('python'),
-            '.js': TreeSitterParser('javascript'), # Added JavaScript parser
-        }
+        self.parsers = {ext: TreeSitterParser(lang) for ext, lang in PARSER_LANGUAGES.items()}
+        # Directory paths whose node and parent CONTAINS edge are known to be committed.
+        self._created_dirs: set[str] = set()
+        # Worker processes for parsing, started on first use and reused by every build
+        # and watcher refresh so their parsers and compiled queries stay warm.
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        # Builds run on the event loop and refreshes on watcher threads; both may start the pool.
+        self._parse_pool_lock = threading.Lock()
         self.create_schema()
 
     # A general schema creation based on common features across languages
     def create_schema(self):
         """Create constraints and indexes in Neo4j."""
+        def _create(tx, statements):
+            for statement in statements:
+                tx.run(statement)
+
         with self.driver.session() as session:
             try:
-                session.run("CREATE CONSTRAINT repository_path IF NOT EXISTS FOR (r:Repository) REQUIRE r.path IS UNIQUE")
-                session.run("CREATE CONSTRAINT file_path IF NOT EXISTS FOR (f:File) REQUIRE f.path IS UNIQUE")
-                session.run("CREATE CONSTRAINT directory_path IF NOT EXISTS FOR (d:Directory) REQUIRE d.path IS UNIQUE")
-                session.run("CREATE CONSTRAINT function_unique IF NOT EXISTS FOR (f:Function) REQUIRE (f.name, f.file_path, f.line_number) IS UNIQUE")
-                session.run("CREATE CONSTRAINT class_unique IF NOT EXISTS FOR (c:Class) REQUIRE (c.name, c.file_path, c.line_number) IS UNIQUE")
-                session.run("CREATE CONSTRAINT variable_unique IF NOT EXISTS FOR (v:Variable) REQUIRE (v.name, v.file_path, v.line_number) IS UNIQUE")
-                session.run("CREATE CONSTRAINT module_name IF NOT EXISTS FOR (m:Module) REQUIRE m.name IS UNIQUE")
-
-                # Indexes for language attribute
-                session.run("CREATE INDEX function_lang IF NOT EXISTS FOR (f:Function) ON (f.lang)")
-                session.run("CREATE INDEX class_lang IF NOT EXISTS FOR (c:Class) ON (c.lang)")
-                
-                session.run("""
-                    CREATE FULLTEXT INDEX code_search_index IF NOT EXISTS 
-                    FOR (n:Function|Class|Variable) 
-                    ON EACH [n.name, n.source, n.docstring]
-                """ )
-                
-                logger.info("Database schema verified/created successfully")
+                session.execute_write(_create, SCHEMA_STATEMENTS)
+            except Exception as e:
+                logger.warning(f"Schema creation warning: {e}; creating constraints and indexes one at a time")
+                for statement in SCHEMA_STATEMENTS:
+                    try:
+                        session.execute_write(_create, (statement,))
+                    except Exception as e:
+                        logger.warning(f"Schema creation warning: {e}")
+            try:
+                session.execute_write(_create, (FULLTEXT_INDEX_STATEMENT,))
             except Exception as e:
-                logger.warning(f"Schema creation warning: {e}")
+                logger.warning(f"Full-text index creation warning: {e}")
+            logger.info("Database schema verified/created successfully")
 
 
     def _pre_scan_for_imports(self, files: list[Path]) -> dict:
@@ -102,180 +378,261 @@ class GraphBuilder:
                     files_by_lang[lang_ext] = []
                 files_by_lang[lang_ext].append(file)
 
-        if '.py' in files_by_lang:
-            from .languages import python as python_lang_module
-            imports_map.update(python_lang_module.pre_scan_python(files_by_lang['.py'], self.parsers['.py']))
-        elif '.js' in files_by_lang:
-            from .languages import javascript as js_lang_module
-            imports_map.update(js_lang_module.pre_scan_javascript(files_by_lang['.js'], self.parsers['.js']))
-            
-        return imports_map
+        scans = []
+        for lang_ext, lang_files in files_by_lang.items():
+            pre_scan = PRE_SCANNERS.get(lang_ext)
+            if pre_scan is None:
+                continue
+            if len(lang_files) < PARALLEL_PRE_SCAN_MIN_FILES:
+                scans.append(pre_scan(lang_files, self.parsers[lang_ext]))
+                continue
+            # Matching the queries is Python-bound, so chunks are scanned in the
+            # parse pool's worker processes. map() keeps the chunks in file order.
+            chunks = [lang_files[i:i + PRE_SCAN_CHUNK_SIZE] for i in range(0, len(lang_files), PRE_SCAN_CHUNK_SIZE)]
+            pool = self._get_parse_pool()
+            try:
+                scans.extend(pool.map(_pre_scan_worker, repeat(lang_ext), chunks))
+            except BrokenProcessPool:
+                self._discard_parse_pool(pool)
+                raise
+
+        for lang_map in scans:
+            for name, paths in lang_map.items():
+                imports_map.setdefault(name, []).extend(paths)
+
+        # The map is read-only from here on: freeze the path lists into tuples and
+        # intern the names, which repeat across every file that references them.
+        return {sys.intern(name): tuple(paths) for name, paths in imports_map.items()}
+
+    def _session_scope(self, session=None):
+        """Reuses the caller's session when one is given, otherwise opens a new one."""
+        return nullcontext(session) if session is not None else self.driver.session()
 
     # Language-agnostic method
-    def add_repository_to_graph(self, repo_path: Path, is_dependency: bool = False):
+    def add_repository_to_graph(self, repo_path: Path, is_dependency: bool = False, session=None):
         """Adds a repository node using its absolute path as the unique key."""
         repo_name = repo_path.name
         repo_path_str = str(repo_path.resolve())
-        with self.driver.session() as session:
+        with self._session_scope(session) as session:
             session.run(
                 """
-                MERGE (r:Repository {path: $path})
-                SET r.name = $name, r.is_dependency = $is_dependency
-                """,
+                MERGE (n:Repository {path: $path})
+                SET n.name = $name, n.is_dependency = $is_dependency
+                """ + DEPENDENCY_LABEL_CLAUSES[bool(is_dependency)],
                 path=repo_path_str,
                 name=repo_name,
                 is_dependency=is_dependency,
             )
 
     # First pass to add file and its contents
-    def add_file_to_graph(self, file_data: Dict, repo_name: str, imports_map: dict):
+    def add_file_to_graph(self, file_data: Dict, repo_name: str, repo_path: Path, imports_map: dict, session=None):
+        """Adds a file and its contents within a single write transaction."""
         logger.info("Executing add_file_to_graph with my change!")
-        """Adds a file and its contents within a single, unified session."""
-        file_path_str = str(Path(file_data['file_path']).resolve())
+        self.add_files_to_graph([file_data], repo_name, repo_path, imports_map, session=session)
+
+    def add_files_to_graph(self, file_data_list: list[Dict], repo_name: str, repo_path: Path, imports_map: dict, session=None):
+        """Adds several files and their contents within a single write transaction."""
+        with self._session_scope(session) as session:
+            new_dirs = session.execute_write(self._add_files_tx, file_data_list, str(repo_path.resolve()))
+        # Only remember directories once their transaction has committed.
+        self._created_dirs.update(new_dirs)
+
+    def _add_files_tx(self, tx, file_data_list: list[Dict], repo_path_str: str) -> set[str]:
+        """
+        Writes each file in turn, so a batch costs one commit instead of one per file.
+        Files already in the graph with the same contents, parser version and
+        dependency flag keep their item subgraph, which would be rewritten unchanged;
+        their File node and containment chain are still merged, since the file may
+        now be reached from another repository root.
+        """
+        unchanged = {
+            record["path"]
+            for record in tx.run(
+                UNCHANGED_FILES_QUERY,
+                files=[
+                    {'path': fd['file_path'], 'content_sha': fd.get('content_sha'), 'is_dependency': fd.get('is_dependency', False)}
+                    for fd in file_data_list
+                ],
+                parser_version=_parser_version(),
+            )
+        }
+        new_dirs: set[str] = set()
+        for file_data in file_data_list:
+            new_dirs.update(self._add_file_tx(
+                tx, file_data, repo_path_str, new_dirs, write_items=file_data['file_path'] not in unchanged
+            ))
+        return new_dirs
+
+    def _add_file_tx(self, tx, file_data: Dict, repo_path_str: str, batch_dirs: Collection[str] = (), write_items: bool = True):
+        """
+        Writes a file's nodes and relationships inside the caller's transaction.
+        Returns the directory paths it created that were in neither `_created_dirs`
+        nor `batch_dirs`, the directories written earlier in the same transaction.
+        With `write_items=False` only the File node and its containment are written.
+        """
+        file_path_str = file_data['file_path']
         file_name = Path(file_path_str).name
         is_dependency = file_data.get('is_dependency', False)
 
-        with self.driver.session() as session:
-            try:
-                # Match repository by path, not name, to avoid conflicts with same-named folders at different locations
-                repo_result = session.run("MATCH (r:Repository {path: $repo_path}) RETURN r.path as path", repo_path=str(Path(file_data['repo_path']).resolve())).single()
-                relative_path = str(Path(file_path_str).relative_to(Path(repo_result['path']))) if repo_result else file_name
-            except ValueError:
-                relative_path = file_name
+        # The caller knows the repository root, so the relative path needs no round-trip.
+        file_path_obj = Path(file_path_str)
+        repo_path_obj = Path(repo_path_str)
+        try:
+            relative_path_to_file = file_path_obj.relative_to(repo_path_obj)
+        except ValueError:
+            relative_path_to_file = Path(file_name)
+        relative_path = str(relative_path_to_file)
 
-            session.run("""
-                MERGE (f:File {path: $path})
-                SET f.name = $name, f.relative_path = $relative_path, f.is_dependency = $is_dependency
-            """, path=file_path_str, name=file_name, relative_path=relative_path, is_dependency=is_dependency)
+        tx.run("""
+            MERGE (n:File {path: $path})
+            SET n.name = $name, n.relative_path = $relative_path, n.is_dependency = $is_dependency,
+                n.content_sha = $content_sha, n.parser_version = $parser_version
+        """ + DEPENDENCY_LABEL_CLAUSES[bool(is_dependency)], path=file_path_str, name=file_name, relative_path=relative_path,
+            is_dependency=is_dependency, content_sha=file_data.get('content_sha'), parser_version=_parser_version())
 
-            file_path_obj = Path(file_path_str)
-            repo_path_obj = Path(repo_result['path'])
-            
-            relative_path_to_file = file_path_obj.relative_to(repo_path_obj)
+        parent_path = str(repo_path_obj)
+        parent_label = 'Repository'
+        dir_rows = []
+
+        for part in relative_path_to_file.parts[:-1]:
+            current_path = Path(parent_path) / part
+            current_path_str = str(current_path)
             
-            parent_path = str(repo_path_obj)
-            parent_label = 'Repository'
+            # Sibling files share their ancestors; skip directories already written.
+            if current_path_str not in self._created_dirs and current_path_str not in batch_dirs:
+                dir_rows.append({'parent_path': parent_path, 'path': current_path_str, 'name': part})
 
-            for part in relative_path_to_file.parts[:-1]:
-                current_path = Path(parent_path) / part
-                current_path_str = str(current_path)
-                
-                session.run(f"""
-                    MATCH (p:{parent_label} {{path: $parent_path}})
-                    MERGE (d:Directory {{path: $current_path}})
-                    SET d.name = $part
-                    MERGE (p)-[:CONTAINS]->(d)
-                """, parent_path=parent_path, current_path=current_path_str, part=part)
-
-                parent_path = current_path_str
-                parent_label = 'Directory'
-
-            session.run(f"""
-                MATCH (p:{parent_label} {{path: $parent_path}})
-                MATCH (f:File {{path: $file_path}})
-                MERGE (p)-[:CONTAINS]->(f)
-            """, parent_path=parent_path, file_path=file_path_str)
-
-            # CONTAINS relationships for functions, classes, and variables
-            for item_data, label in [(file_data['functions'], 'Function'), (file_data['classes'], 'Class'), (file_data['variables'], 'Variable')]:
-                for item in item_data:
-                    # Ensure cyclomatic_complexity is set for functions
-                    if label == 'Function' and 'cyclomatic_complexity' not in item:
-                        item['cyclomatic_complexity'] = 1 # Default value
-
-                    query = f"""
-                        MATCH (f:File {{path: $file_path}})
-                        MERGE (n:{label} {{name: $name, file_path: $file_path, line_number: $line_number}})
-                        SET n += $props
-                        MERGE (f)-[:CONTAINS]->(n)
-                    """
-                    session.run(query, file_path=file_path_str, name=item['name'], line_number=item['line_number'], props=item)
-                    
-                    if label == 'Function':
-                        for arg_name in item.get('args', []):
-                            session.run("""
-                                MATCH (fn:Function {name: $func_name, file_path: $file_path, line_number: $line_number})
-                                MERGE (p:Parameter {name: $arg_name, file_path: $file_path, function_line_number: $line_number})
-                                MERGE (fn)-[:HAS_PARAMETER]->(p)
-                            """, func_name=item['name'], file_path=file_path_str, line_number=item['line_number'], arg_name=arg_name)
-
-            # Create CONTAINS relationships for nested functions
-            for item in file_data.get('functions', []):
-                if item.get("context_type") == "function_definition":
-                    session.run("""
-                        MATCH (outer:Function {name: $context, file_path: $file_path})
-                        MATCH (inner:Function {name: $name, file_path: $file_path, line_number: $line_number})
-                        MERGE (outer)-[:CONTAINS]->(inner)
-                    """, context=item["context"], file_path=file_path_str, name=item["name"], line_number=item["line_number"])
-
-            # Handle imports and create IMPORTS relationships
-            for imp in file_data.get('imports', []):
-                logger.info(f"Processing import: {imp}")
-                lang = file_data.get('lang')
-                if lang == 'javascript':
-                    # New, correct logic for JS
-                    module_name = imp.get('source')
-                    if not module_name: continue
-
-                    # Use a map for relationship properties to handle optional alias
-                    rel_props = {'imported_name': imp.get('name', '*')}
-                    if imp.get('alias'):
-                        rel_props['alias'] = imp.get('alias')
-
-                    session.run("""
-                        MATCH (f:File {path: $file_path})
-                        MERGE (m:Module {name: $module_name})
-                        MERGE (f)-[r:IMPORTS]->(m)
-                        SET r += $props
-                    """, file_path=file_path_str, module_name=module_name, props=rel_props)
-                else:
-                    # Existing logic for Python (and other languages)
-                    set_clauses = ["m.alias = $alias"]
-                    if 'full_import_name' in imp:
-                        set_clauses.append("m.full_import_name = $full_import_name")
-                    set_clause_str = ", ".join(set_clauses)
-
-                    session.run(f"""
-                        MATCH (f:File {{path: $file_path}})
-                        MERGE (m:Module {{name: $name}})
-                        SET {set_clause_str}
-                        MERGE (f)-[:IMPORTS]->(m)
-                    """, file_path=file_path_str, **imp)
-
-            # Handle CONTAINS relationship between class to their children like variables
-            for func in file_data.get('functions', []):
-                if func.get('class_context'):
-                    session.run("""
-                        MATCH (c:Class {name: $class_name, file_path: $file_path})
-                        MATCH (fn:Function {name: $func_name, file_path: $file_path, line_number: $func_line})
-                        MERGE (c)-[:CONTAINS]->(fn)
-                    """, 
-                    class_name=func['class_context'],
-                    file_path=file_path_str,
-                    func_name=func['name'],
-                    func_line=func['line_number'])
-
-            # Class inheritance is handled in a separate pass after all files are processed.
-            # Function calls are also handled in a separate pass after all files are processed.
+            parent_path = current_path_str
+            parent_label = 'Directory'
+
+        if dir_rows:
+            tx.run(DIRECTORY_CHAIN_QUERY, dirs=dir_rows)
+        new_dirs = [row['path'] for row in dir_rows]
+
+        tx.run(FILE_CONTAINS_QUERIES[parent_label], parent_path=parent_path, file_path=file_path_str)
+        if not write_items:
+            return new_dirs
+
+        # CONTAINS relationships for functions, classes, and variables.
+        # Language and dependency flags are file-level values, so the parsers
+        # keep them off the per-item records and they are stamped here instead.
+        lang = file_data.get('lang')
+        # The parsers compute cyclomatic_complexity while extracting each function,
+        # so the records are written as-is.
+        for item_data, label in [(file_data['functions'], 'Function'), (file_data['classes'], 'Class'), (file_data['variables'], 'Variable')]:
+            # One UNWIND per label and batch instead of one round-trip per item.
+            for batch in _batched(item_data):
+                tx.run(ITEM_MERGE_QUERIES[label, bool(is_dependency)], file_path=file_path_str, items=batch, lang=lang, is_dependency=is_dependency)
+
+        # Parameter, nested-function and class-method rows all come from the
+        # function records, so they are collected in a single pass.
+        param_rows, nested_rows, method_rows = [], [], []
+        seen_params = set()
+        for item in file_data.get('functions', []):
+            name, line_number = item['name'], item['line_number']
+            for arg_name in item.get('args', []):
+                # A repeated name would only MERGE the same Parameter again.
+                if (name, line_number, arg_name) in seen_params:
+                    continue
+                seen_params.add((name, line_number, arg_name))
+                param_rows.append({'func_name': name, 'line_number': line_number, 'arg_name': arg_name})
+            if item.get("context_type") == "function_definition":
+                nested_rows.append({'context': item['context'], 'name': name, 'line_number': line_number})
+            if item.get('class_context'):
+                method_rows.append({'class_name': item['class_context'], 'func_name': name, 'func_line': line_number})
+
+        for batch in _batched(param_rows):
+            tx.run("""
+                UNWIND $params AS param
+                MATCH (fn:Function {name: param.func_name, file_path: $file_path, line_number: param.line_number})
+                MERGE (p:Parameter {name: param.arg_name, file_path: $file_path, function_line_number: param.line_number})
+                MERGE (fn)-[:HAS_PARAMETER]->(p)
+            """, file_path=file_path_str, params=batch)
+
+        # Create CONTAINS relationships for nested functions
+        for batch in _batched(nested_rows):
+            tx.run("""
+                UNWIND $rows AS row
+                MATCH (outer:Function {name: row.context, file_path: $file_path})
+                MATCH (inner:Function {name: row.name, file_path: $file_path, line_number: row.line_number})
+                MERGE (outer)-[:CONTAINS]->(inner)
+            """, file_path=file_path_str, rows=batch)
+
+        # Handle imports and create IMPORTS relationships
+        # Keyed by the row's contents so a repeated import is written once. A repeat
+        # moves to the end, keeping the order of the SETs (last one wins) unchanged.
+        import_rows = {}
+        for imp in file_data.get('imports', []):
+            logger.info(f"Processing import: {imp}")
+            if lang == 'javascript':
+                # New, correct logic for JS
+                module_name = imp.get('source')
+                if not module_name: continue
+
+                # Use a map for relationship properties to handle optional alias
+                rel_props = {'imported_name': imp.get('name', '*')}
+                if imp.get('alias'):
+                    rel_props['alias'] = imp.get('alias')
+                row = {'module_name': module_name, 'props': rel_props}
+                key = (module_name, tuple(rel_props.items()))
+            else:
+                # Existing logic for Python (and other languages). A missing
+                # full_import_name leaves the module's current value untouched.
+                row = {'name': imp['name'], 'alias': imp.get('alias'), 'full_import_name': imp.get('full_import_name')}
+                key = tuple(row.values())
+            import_rows.pop(key, None)
+            import_rows[key] = row
+        import_rows = list(import_rows.values())
+
+        for batch in _batched(import_rows):
+            if lang == 'javascript':
+                tx.run("""
+                    MATCH (f:File {path: $file_path})
+                    UNWIND $imports AS imp
+                    MERGE (m:Module {name: imp.module_name})
+                    MERGE (f)-[r:IMPORTS]->(m)
+                    SET r += imp.props
+                """, file_path=file_path_str, imports=batch)
+            else:
+                tx.run("""
+                    MATCH (f:File {path: $file_path})
+                    UNWIND $imports AS imp
+                    MERGE (m:Module {name: imp.name})
+                    SET m.alias = imp.alias, m.full_import_name = coalesce(imp.full_import_name, m.full_import_name)
+                    MERGE (f)-[:IMPORTS]->(m)
+                """, file_path=file_path_str, imports=batch)
+
+        # Handle CONTAINS relationship between class to their children like variables
+        for batch in _batched(method_rows):
+            tx.run("""
+                UNWIND $rows AS row
+                MATCH (c:Class {name: row.class_name, file_path: $file_path})
+                MATCH (fn:Function {name: row.func_name, file_path: $file_path, line_number: row.func_line})
+                MERGE (c)-[:CONTAINS]->(fn)
+            """, file_path=file_path_str, rows=batch)
+
+        # Class inheritance is handled in a separate pass after all files are processed.
+        # Function calls are also handled in a separate pass after all files are processed.
+        return new_dirs
 
     # Second pass to create relationships that depend on all files being present like call functions and class inheritance
-    def _create_function_calls(self, session, file_data: Dict, imports_map: dict):
-        """Create CALLS relationships with a unified, prioritized logic flow for all call types."""
-        caller_file_path = str(Path(file_data['file_path']).resolve())
+    def _resolve_function_calls(self, file_data: Dict, imports_map: dict) -> Tuple[list, list]:
+        """Resolves a file's calls into CALLS rows, split by function-level and file-level callers."""
+        calls_from_function, calls_from_file = [], []
+        caller_file_path = file_data['file_path']
         local_function_names = {func['name'] for func in file_data.get('functions', [])}
-        local_imports = {imp.get('alias') or imp['name'].split('.')[-1]: imp['name'] 
-                        for imp in file_data.get('imports', [])}
+        local_imports = _local_import_paths(file_data)
         
         for call in file_data.get('function_calls', []):
             called_name = call['name']
-            if called_name in __builtins__: continue
+            # The Python parser already drops these; other languages are filtered here.
+            if called_name in BUILTIN_NAMES: continue
 
             resolved_path = None
             
             if call.get('inferred_obj_type'):
-                obj_type = call['inferred_obj_type']
-                possible_paths = imports_map.get(obj_type, [])
-                if len(possible_paths) > 0:
+                possible_paths = imports_map.get(call['inferred_obj_type'])
+                if possible_paths:
                     resolved_path = possible_paths[0]
             
             else:
@@ -287,60 +644,56 @@ class GraphBuilder:
                 elif len(possible_paths) == 1:
                     resolved_path = possible_paths[0]
                 elif len(possible_paths) > 1 and lookup_name in local_imports:
-                    full_import_name = local_imports[lookup_name]
+                    import_path = local_imports[lookup_name]
                     for path in possible_paths:
-                        if full_import_name.replace('.', '/') in path:
+                        if import_path in path:
                             resolved_path = path
                             break
             
             if not resolved_path:
-                if called_name in imports_map and imports_map[called_name]:
-                    resolved_path = imports_map[called_name][0]
-                else:
-                    resolved_path = caller_file_path
+                # One lookup serves both the membership test and the first-path fetch.
+                possible_paths = imports_map.get(called_name)
+                resolved_path = possible_paths[0] if possible_paths else caller_file_path
 
+            row = {
+                'caller_file_path': caller_file_path,
+                'called_name': called_name,
+                'called_file_path': resolved_path,
+                'line_number': call['line_number'],
+                'args': call.get('args', []),
+                'full_call_name': call.get('full_name', called_name),
+            }
             caller_context = call.get('context')
             if caller_context and len(caller_context) == 3 and caller_context[0] is not None:
-                caller_name, _, caller_line_number = caller_context
-                session.run("""
-                    MATCH (caller:Function {name: $caller_name, file_path: $caller_file_path, line_number: $caller_line_number})
-                    MATCH (called:Function {name: $called_name, file_path: $called_file_path})
-                    MERGE (caller)-[:CALLS {line_number: $line_number, args: $args, full_call_name: $full_call_name}]->(called)
-                """,
-                caller_name=caller_name,
-                caller_file_path=caller_file_path,
-                caller_line_number=caller_line_number,
-                called_name=called_name,
-                called_file_path=resolved_path,
-                line_number=call['line_number'],
-                args=call.get('args', []),
-                full_call_name=call.get('full_name', called_name))
+                row['caller_name'] = caller_context[0]
+                row['caller_line_number'] = caller_context[2]
+                calls_from_function.append(row)
             else:
-                session.run("""
-                    MATCH (caller:File {path: $caller_file_path})
-                    MATCH (called:Function {name: $called_name, file_path: $called_file_path})
-                    MERGE (caller)-[:CALLS {line_number: $line_number, args: $args, full_call_name: $full_call_name}]->(called)
-                """,
-                caller_file_path=caller_file_path,
-                called_name=called_name,
-                called_file_path=resolved_path,
-                line_number=call['line_number'],
-                args=call.get('args', []),
-                full_call_name=call.get('full_name', called_name))
-
-    def _create_all_function_calls(self, all_file_data: list[Dict], imports_map: dict):
+                calls_from_file.append(row)
+
+        return calls_from_function, calls_from_file
+
+    def _create_all_function_calls(self, all_file_data: list[Dict], imports_map: dict, session=None):
         """Create CALLS relationships for all functions after all files have been processed."""
-        with self.driver.session() as session:
-            for file_data in all_file_data:
-                self._create_function_calls(session, file_data, imports_map)
+        calls_from_function, calls_from_file = [], []
+        for file_data in all_file_data:
+            from_function, from_file = self._resolve_function_calls(file_data, imports_map)
+            calls_from_function.extend(from_function)
+            calls_from_file.extend(from_file)
 
-    def _create_inheritance_links(self, session, file_data: Dict, imports_map: dict):
-        """Create INHERITS relationships with a more robust resolution logic."""
-        caller_file_path = str(Path(file_data['file_path']).resolve())
+        # Calls from every file go out as a few large UNWINDs that commit in chunks.
+        with self._session_scope(session) as session:
+            for query, rows in ((CALLS_FROM_FUNCTION_QUERY, calls_from_function), (CALLS_FROM_FILE_QUERY, calls_from_file)):
+                for batch in _batched(rows, CALLS_BATCH_SIZE):
+                    session.run(query, rows=batch).consume()
+
+    def _resolve_inheritance_links(self, file_data: Dict, imports_map: dict) -> list:
+        """Resolves a file's base classes into INHERITS rows, using only local data and `imports_map`."""
+        rows = []
+        caller_file_path = file_data['file_path']
         local_class_names = {c['name'] for c in file_data.get('classes', [])}
-        # Create a map of local import aliases/names to full import names
-        local_imports = {imp.get('alias') or imp['name'].split('.')[-1]: imp['name']
-                         for imp in file_data.get('imports', [])}
+        # Map local import aliases/names to the imported module's path fragment
+        local_imports = _local_import_paths(file_data)
 
         for class_item in file_data.get('classes', []):
             if not class_item.get('bases'):
@@ -359,11 +712,11 @@ class GraphBuilder:
                     
                     # Case 1: The prefix is a known import
                     if lookup_name in local_imports:
-                        full_import_name = local_imports[lookup_name]
+                        import_path = local_imports[lookup_name]
                         possible_paths = imports_map.get(target_class_name, [])
                         # Find the path that corresponds to the imported module
                         for path in possible_paths:
-                            if full_import_name.replace('.', '/') in path:
+                            if import_path in path:
                                 resolved_path = path
                                 break
                 # Handle simple names
@@ -374,72 +727,87 @@ class GraphBuilder:
                         resolved_path = caller_file_path
                     # Case 3: The base class was imported directly (e.g., from module import Parent)
                     elif lookup_name in local_imports:
-                        full_import_name = local_imports[lookup_name]
+                        import_path = local_imports[lookup_name]
                         possible_paths = imports_map.get(target_class_name, [])
                         for path in possible_paths:
-                            if full_import_name.replace('.', '/') in path:
+                            if import_path in path:
                                 resolved_path = path
                                 break
                     # Case 4: Fallback to global map (less reliable)
-                    elif lookup_name in imports_map:
-                        possible_paths = imports_map[lookup_name]
-                        if len(possible_paths) == 1:
+                    else:
+                        possible_paths = imports_map.get(lookup_name)
+                        if possible_paths and len(possible_paths) == 1:
                             resolved_path = possible_paths[0]
                 
                 # If a path was found, create the relationship
                 if resolved_path:
-                    session.run("""
-                        MATCH (child:Class {name: $child_name, file_path: $file_path})
-                        MATCH (parent:Class {name: $parent_name, file_path: $resolved_parent_file_path})
-                        MERGE (child)-[:INHERITS]->(parent)
-                    """,
-                    child_name=class_item['name'],
-                    file_path=caller_file_path,
-                    parent_name=target_class_name,
-                    resolved_parent_file_path=resolved_path)
-
-    def _create_all_inheritance_links(self, all_file_data: list[Dict], imports_map: dict):
+                    rows.append({
+                        'child_name': class_item['name'],
+                        'file_path': caller_file_path,
+                        'parent_name': target_class_name,
+                        'parent_file_path': resolved_path,
+                    })
+
+        return rows
+
+    def _create_all_inheritance_links(self, all_file_data: list[Dict], imports_map: dict, session=None):
         """Create INHERITS relationships for all classes after all files have been processed."""
-        with self.driver.session() as session:
-            for file_data in all_file_data:
-                self._create_inheritance_links(session, file_data, imports_map)
+        rows = []
+        for file_data in all_file_data:
+            rows.extend(self._resolve_inheritance_links(file_data, imports_map))
+
+        with self._session_scope(session) as session:
+            for batch in _batched(rows, CALLS_BATCH_SIZE):
+                session.run(INHERITS_QUERY, rows=batch).consume()
                 
     def delete_file_from_graph(self, file_path: str):
         """Deletes a file and all its contained elements and relationships."""
         file_path_str = str(Path(file_path).resolve())
+        # Emptied directories may be deleted below, so the cache can no longer be trusted.
+        self._created_dirs.clear()
         with self.driver.session() as session:
-            parents_res = session.run("""
-                MATCH (f:File {path: $path})<-[:CONTAINS*]-(d:Directory)
-                RETURN d.path as path ORDER BY d.path DESC
-            """, path=file_path_str)
-            parent_paths = [record["path"] for record in parents_res]
-
-            session.run(
-                """
+            # One statement: a directory above the file is emptied exactly when it and
+            # every directory between it and the file have a single child, so those are
+            # found from the path before anything is deleted.
+            session.run("""
                 MATCH (f:File {path: $path})
+                OPTIONAL MATCH p = (d:Directory)-[:CONTAINS*]->(f)
+                WITH f, collect(CASE WHEN all(n IN nodes(p)[..-1] WHERE size([(n)-[:CONTAINS]->() | 1]) = 1) THEN d END) AS emptied
                 OPTIONAL MATCH (f)-[:CONTAINS]->(element)
-                DETACH DELETE f, element
-                """,
-                path=file_path_str,
-            )
+                WITH f, emptied, collect(element) AS elements
+                FOREACH (n IN [f] + elements + emptied | DETACH DELETE n)
+            """, path=file_path_str)
             logger.info(f"Deleted file and its elements from graph: {file_path_str}")
 
-            for path in parent_paths:
-                session.run("""
-                    MATCH (d:Directory {path: $path})
-                    WHERE NOT (d)-[:CONTAINS]->()
-                    DETACH DELETE d
-                """, path=path)
-
     def delete_repository_from_graph(self, repo_path: str):
         """Deletes a repository and all its contents from the graph."""
         repo_path_str = str(Path(repo_path).resolve())
+        self._created_dirs.clear()
         with self.driver.session() as session:
-            session.run("""MATCH (r:Repository {path: $path})
-                          OPTIONAL MATCH (r)-[:CONTAINS*]->(e)
-                          DETACH DELETE r, e""", path=repo_path_str)
+            session.execute_write(self._delete_repository_tx, repo_path_str)
             logger.info(f"Deleted repository and its contents from graph: {repo_path_str}")
 
+    def _delete_repository_tx(self, tx, repo_path_str: str):
+        """Deletes a repository's subtree, then only those modules it alone imported."""
+        # Only modules this repository imports can be orphaned by deleting it,
+        # so those are checked by name instead of sweeping every Module node.
+        module_names = tx.run("""
+            MATCH (:Repository {path: $path})-[:CONTAINS*]->(:File)-[:IMPORTS]->(m:Module)
+            RETURN collect(DISTINCT m.name) AS names
+        """, path=repo_path_str).single()["names"]
+
+        tx.run("""MATCH (r:Repository {path: $path})
+                  OPTIONAL MATCH (r)-[:CONTAINS*]->(e)
+                  DETACH DELETE r, e""", path=repo_path_str)
+
+        if module_names:
+            tx.run("""
+                UNWIND $names AS name
+                MATCH (m:Module {name: name})
+                WHERE NOT ()-[:IMPORTS]->(m)
+                DETACH DELETE m
+            """, names=module_names)
+
     def update_file_in_graph(self, file_path: Path, repo_path: Path, imports_map: dict):
         """Updates a single file's nodes in the graph."""
         file_path_str = str(file_path.resolve())
@@ -451,7 +819,7 @@ class GraphBuilder:
             file_data = self.parse_file(repo_path, file_path)
             
             if "error" not in file_data:
-                self.add_file_to_graph(file_data, repo_name, imports_map)
+                self.add_file_to_graph(file_data, repo_name, repo_path, imports_map)
                 return file_data
             else:
                 logger.error(f"Skipping graph add for {file_path_str} due to parsing error: {file_data['error']}")
@@ -465,33 +833,98 @@ class GraphBuilder:
         if not parser:
             logger.warning(f"No parser found for file extension {file_path.suffix}. Skipping {file_path}")
             return {"file_path": str(file_path), "error": f"No parser for {file_path.suffix}"}
+        return _parse_with(parser, repo_path, file_path, is_dependency)
 
-        debug_log(f"[parse_file] Starting parsing for: {file_path} with {parser.language_name} parser")
+    def parse_files_parallel(self, repo_path: Path, paths: list[Path], is_dependency: bool = False) -> Iterator[Dict]:
+        """
+        Parses `paths` on a process pool and yields each file's data in input order.
+        Files are handed to the workers in chunks to keep the per-file IPC cost low.
+        """
+        if not paths:
+            return
+        pool = self._get_parse_pool()
         try:
-            file_data = parser.parse(file_path, is_dependency)
-            file_data['repo_path'] = str(repo_path)
-            if debug_mode:
-                debug_log(f"[parse_file] Successfully parsed: {file_path}")
-            return file_data
-        except Exception as e:
-            logger.error(f"Error parsing {file_path} with {parser.language_name} parser: {e}")
-            debug_log(f"[parse_file] Error parsing {file_path}: {e}")
-            return {"file_path": str(file_path), "error": str(e)}
+            yield from pool.map(_parse_file_worker, repeat(repo_path), paths, repeat(is_dependency), chunksize=8)
+        except BrokenProcessPool:
+            self._discard_parse_pool(pool)
+            raise
+
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Returns the shared parsing pool, starting it on first use."""
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=PARSE_POOL_CONTEXT)
+            return self._parse_pool
 
-    def estimate_processing_time(self, path: Path) -> Optional[Tuple[int, float]]:
-        """Estimate processing time and file count"""
+    def _discard_parse_pool(self, pool: ProcessPoolExecutor):
+        """
+        Drops a pool that broke because a worker died (e.g. a crash or OOM kill), so
+        the next `_get_parse_pool` starts a new one instead of failing every build.
+        """
+        with self._parse_pool_lock:
+            if self._parse_pool is pool:
+                self._parse_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _write_parsed_files(self, queue: asyncio.Queue, repo_name: str, repo_path: Path, imports_map: dict, session):
+        """
+        Writer task for a build: drains parsed files from `queue` and writes whatever
+        has accumulated, up to FILES_PER_TRANSACTION files, in one transaction.
+        Stops at the `None` sentinel.
+        """
+        done = False
+        while not done:
+            batch = []
+            file_data = await queue.get()
+            while file_data is not None:
+                batch.append(file_data)
+                if len(batch) >= FILES_PER_TRANSACTION or queue.empty():
+                    break
+                file_data = queue.get_nowait()
+            done = file_data is None
+            if batch:
+                # Writes run off the event loop so Neo4j round-trips overlap with
+                # parsing, other jobs and requests; the session is only used here.
+                write = asyncio.ensure_future(
+                    asyncio.to_thread(self.add_files_to_graph, batch, repo_name, repo_path, imports_map, session=session)
+                )
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # The thread cannot be interrupted; the batch must finish before
+                    # the build closes the session it is using.
+                    await asyncio.wait({write})
+                    raise
+
+    @staticmethod
+    async def _enqueue_write(queue: asyncio.Queue, writer: asyncio.Task, file_data: Optional[Dict]):
+        """Puts `file_data` on the write queue, raising the writer's error if it stopped."""
+        put = asyncio.ensure_future(queue.put(file_data))
+        await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+        if writer.done() and (writer.cancelled() or writer.exception()):
+            writer.result()
+
+    def find_source_files(self, path: Path, is_dependency: bool = False) -> list[Path]:
+        """
+        Lists the files under `path` that one of the parsers supports. A top-level
+        `build`/`dist` is the project's own output and skipped, except in dependency
+        packages, where such directories are part of the installed sources.
+        """
+        return list(iter_source_files(path, self.parsers.keys(), skip_build_output=not is_dependency))
+
+    def estimate_processing_time(self, path: Path, files: Optional[list[Path]] = None) -> Optional[Tuple[int, float]]:
+        """
+        Estimate processing time and file count. When the caller already has the
+        file list from `find_source_files`, it is counted instead of walking again.
+        """
         try:
-            supported_extensions = self.parsers.keys()
-            if path.is_file():
-                if path.suffix in supported_extensions:
-                    files = [path]
-                else:
-                    return 0, 0.0 # Not a supported file type
+            if files is not None:
+                total_files = len(files)
             else:
-                all_files = path.rglob("*")
-                files = [f for f in all_files if f.is_file() and f.suffix in supported_extensions]
-            
-            total_files = len(files)
+                # Count only; no Path objects need to be kept around.
+                total_files = sum(1 for _ in iter_source_files(path, self.parsers.keys()))
             estimated_time = total_files * 0.05 # tree-sitter is faster
             return total_files, estimated_time
         except Exception as e:
@@ -499,46 +932,84 @@ class GraphBuilder:
             return None
 
     async def build_graph_from_path_async(
-        self, path: Path, is_dependency: bool = False, job_id: str = None
+        self, path: Path, is_dependency: bool = False, job_id: str = None, files: Optional[list[Path]] = None
     ):
-        """Builds graph from a directory or file path."""
+        """
+        Builds graph from a directory or file path. `files`, from `find_source_files`,
+        saves walking the tree again when the caller has already listed it.
+        """
         try:
             if job_id:
                 self.job_manager.update_job(job_id, status=JobStatus.RUNNING)
             
-            self.add_repository_to_graph(path, is_dependency)
-            repo_name = path.name
+            self._created_dirs.clear()
+            # One session for the whole build keeps the Bolt connection warm across files.
+            with self.driver.session() as session:
+                self.add_repository_to_graph(path, is_dependency, session=session)
+                repo_name = path.name
 
-            supported_extensions = self.parsers.keys()
-            all_files = path.rglob("*") if path.is_dir() else [path]
-            files = [f for f in all_files if f.is_file() and f.suffix in supported_extensions]
-            if job_id:
-                self.job_manager.update_job(job_id, total_files=len(files))
-            
-            debug_log("Starting pre-scan to build imports map...")
-            imports_map = self._pre_scan_for_imports(files)
-            debug_log(f"Pre-scan complete. Found {len(imports_map)} definitions.")
-
-            all_file_data = []
-
-            processed_count = 0
-            for file in files:
-                if file.is_file():
-                    if job_id:
-                        self.job_manager.update_job(job_id, current_file=str(file))
-                    repo_path = path.resolve() if path.is_dir() else file.parent.resolve()
-                    file_data = self.parse_file(repo_path, file, is_dependency)
-                    if "error" not in file_data:
-                        self.add_file_to_graph(file_data, repo_name, imports_map)
-                        all_file_data.append(file_data)
-                    processed_count += 1
-                    if job_id:
-                        self.job_manager.update_job(job_id, processed_files=processed_count)
-                    await asyncio.sleep(0.01)
-
-            self._create_all_inheritance_links(all_file_data, imports_map)
-            self._create_all_function_calls(all_file_data, imports_map)
+                if files is None:
+                    files = self.find_source_files(path, is_dependency)
+                if job_id:
+                    self.job_manager.update_job(job_id, total_files=len(files))
             
+                if debug_mode:
+                    debug_log("Starting pre-scan to build imports map...")
+                # The pre-scan is blocking file I/O and parsing; keep it off the event loop.
+                imports_map = await asyncio.to_thread(self._pre_scan_for_imports, files)
+                if debug_mode:
+                    debug_log("Pre-scan complete. Found %d definitions.", len(imports_map))
+
+                all_file_data = []
+                repo_path = path.resolve() if path.is_dir() else path.parent.resolve()
+
+                # Parsing is CPU-bound, so it fans out over worker processes, and the
+                # parsed files go through a bounded queue to a single writer task.
+                # Parsing continues while a batch is being written, and only a window
+                # of files is in flight, so results never pile up on large repositories.
+                loop = asyncio.get_running_loop()
+                pool = self._get_parse_pool()
+                window = 2 * (os.cpu_count() or 1)
+                write_queue: asyncio.Queue = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
+                writer = asyncio.create_task(
+                    self._write_parsed_files(write_queue, repo_name, repo_path, imports_map, session)
+                )
+                try:
+                    processed_count = 0
+                    remaining = iter(files)
+                    pending = set()
+                    while True:
+                        for file in remaining:
+                            pending.add(loop.run_in_executor(pool, _parse_file_worker, repo_path, file, is_dependency))
+                            if len(pending) >= window:
+                                break
+                        if not pending:
+                            break
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for next_parsed in done:
+                            file_data = next_parsed.result()
+                            if job_id:
+                                self.job_manager.update_job(job_id, current_file=file_data['file_path'])
+                            if "error" not in file_data:
+                                await self._enqueue_write(write_queue, writer, file_data)
+                                all_file_data.append(file_data)
+                            processed_count += 1
+                            if job_id:
+                                self.job_manager.update_job(job_id, processed_files=processed_count)
+                    await self._enqueue_write(write_queue, writer, None)
+                    await writer
+                except BrokenProcessPool:
+                    self._discard_parse_pool(pool)
+                    raise
+                finally:
+                    writer.cancel()
+                    # Wait for a batch already being written before leaving the session
+                    # block. The error that ended the build is the one that propagates.
+                    await asyncio.gather(writer, return_exceptions=True)
+
+                await asyncio.to_thread(self._create_all_inheritance_links, all_file_data, imports_map, session=session)
+                await asyncio.to_thread(self._create_all_function_calls, all_file_data, imports_map, session=session)
+
             if job_id:
                 self.job_manager.update_job(job_id, status=JobStatus.COMPLETED, end_time=datetime.now())
         except Exception as e:
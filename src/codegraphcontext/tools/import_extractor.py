@@ -5,18 +5,167 @@ from source code files of various programming languages.
 """
 import ast
 import logging
-import re
 from pathlib import Path
-from typing import Set
+from types import MappingProxyType
+from typing import Any, FrozenSet, Mapping, Optional, Set, Tuple
 
 import stdlibs
 import os
+import sys
+import threading
 from datetime import datetime
 
+from tree_sitter import Parser
+from tree_sitter_languages import get_language
+
 from ..utils.debug_log import debug_log
+from ..utils.parse_cache import ParseCache, open_parse_cache
+from ..utils.source_files import iter_source_files, open_source
 
 logger = logging.getLogger(__name__)
 
+# Built once; used to drop standard library modules from Python import listings.
+STDLIB_MODULES = frozenset(stdlibs.module_names)
+
+# Languages to their common file extensions, built once. Extensions are sets, so
+# testing a file's suffix is a single hash lookup.
+FILE_EXTENSIONS: Mapping[str, FrozenSet[str]] = MappingProxyType({
+    'python': frozenset({'.py'}), 'javascript': frozenset({'.js', '.jsx', '.mjs'}),
+    'typescript': frozenset({'.ts', '.tsx'}), 'java': frozenset({'.java'}),
+})
+
+# Languages to the name of the ImportExtractor method that reads their imports.
+EXTRACTORS: Mapping[str, str] = MappingProxyType({
+    'python': 'extract_python_imports',
+    'javascript': 'extract_javascript_imports',
+    'typescript': 'extract_javascript_imports',
+    'java': 'extract_java_imports',
+})
+
+# JavaScript-family and Java imports are read from tree-sitter syntax trees, which
+# skips strings and comments that merely look like imports. Each query captures
+# the module specifier; `require_source` is only kept when the callee is `require`.
+JS_IMPORTS_QUERY = """
+    (import_statement source: (string (string_fragment) @source))
+    (export_statement source: (string (string_fragment) @source))
+    (call_expression function: (import) arguments: (arguments . (string (string_fragment) @source)))
+    (call_expression function: (identifier) arguments: (arguments . (string (string_fragment) @require_source)))
+"""
+# TypeScript adds `import x = require('...')`.
+TS_IMPORTS_QUERY = JS_IMPORTS_QUERY + """
+    (import_require_clause source: (string (string_fragment) @source))
+"""
+JAVA_IMPORTS_QUERY = """
+    (import_declaration (scoped_identifier) @source)
+    (import_declaration (identifier) @source)
+"""
+
+# File suffix -> (tree-sitter language, imports query).
+IMPORT_GRAMMARS = {
+    '.js': ('javascript', JS_IMPORTS_QUERY),
+    '.jsx': ('javascript', JS_IMPORTS_QUERY),
+    '.mjs': ('javascript', JS_IMPORTS_QUERY),
+    '.ts': ('typescript', TS_IMPORTS_QUERY),
+    '.tsx': ('tsx', TS_IMPORTS_QUERY),
+    '.java': ('java', JAVA_IMPORTS_QUERY),
+}
+
+# tree-sitter parsers are not thread-safe, so each thread builds its own on first
+# use and keeps them, with their compiled queries, for every later file.
+_import_parsers = threading.local()
+
+def _get_import_parser(suffix: str) -> Tuple[Parser, Any]:
+    parsers = getattr(_import_parsers, 'by_suffix', None)
+    if parsers is None:
+        parsers = _import_parsers.by_suffix = {}
+    if suffix not in parsers:
+        language_name, query_str = IMPORT_GRAMMARS.get(suffix, IMPORT_GRAMMARS['.js'])
+        language = get_language(language_name)
+        parser = Parser()
+        parser.set_language(language)
+        parsers[suffix] = (parser, language.query(query_str))
+    return parsers[suffix]
+
+def _iter_import_sources(file_path: str):
+    """Yields `(capture_name, text)` for each import specifier in a JS/TS/Java file."""
+    parser, query = _get_import_parser(Path(file_path).suffix)
+    with open_source(file_path) as source:
+        tree = parser.parse(source)
+        # Node text is read from `source`, so it stays open while captures are read.
+        for node, capture_name in query.captures(tree.root_node):
+            if capture_name == 'require_source':
+                callee = node.parent.parent.parent.child_by_field_name('function')
+                if callee is None or callee.text != b'require':
+                    continue
+            yield capture_name, node.text.decode('utf-8', errors='replace')
+
+# Fields of compound statements (and except/case clauses) holding nested statements.
+STATEMENT_BLOCK_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+def _iter_statements(statements: list):
+    """
+    Yields every statement in `statements`, including those nested in functions,
+    classes and control flow, without descending into expressions. Imports are
+    statements, so this finds all of them while skipping most of the tree's nodes.
+    """
+    stack = list(statements)
+    while stack:
+        node = stack.pop()
+        yield node
+        for field in STATEMENT_BLOCK_FIELDS:
+            block = getattr(node, field, None)
+            if isinstance(block, list):
+                stack.extend(block)
+
+# With CGC_IMPORTS_HEADER_ONLY=1, only the import block at the top of each module is
+# scanned. Faster on long files, but imports made later (e.g. inside functions) are missed.
+HEADER_IMPORTS_ONLY = os.environ.get("CGC_IMPORTS_HEADER_ONLY") == "1"
+
+IMPORT_STATEMENT_TYPES = (ast.Import, ast.ImportFrom)
+
+def _is_header_statement(node: ast.stmt) -> bool:
+    """
+    Whether `node` can belong to a module's import header: an import, the module
+    docstring, `__all__`, or a `try:`/`if` guard (e.g. `if TYPE_CHECKING:`) whose
+    body holds only imports. Calls such as `main()` or `sys.path.insert(...)` end it.
+    """
+    if isinstance(node, IMPORT_STATEMENT_TYPES):
+        return True
+    if isinstance(node, ast.Expr):
+        return isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+    if isinstance(node, ast.Assign):
+        return any(isinstance(target, ast.Name) and target.id == '__all__' for target in node.targets)
+    if isinstance(node, (ast.Try, ast.If)):
+        return all(isinstance(child, IMPORT_STATEMENT_TYPES) for child in node.body)
+    return False
+
+def _iter_header_statements(tree: ast.Module):
+    """
+    Yields the statements of `tree`'s import header, stopping at the first module
+    level statement that cannot be part of it, such as a function, class or call.
+    """
+    for node in tree.body:
+        if not _is_header_statement(node):
+            return
+        if isinstance(node, (ast.Try, ast.If)):
+            yield from _iter_statements([node])
+        else:
+            yield node
+
+# Bump when the shape of the extracted imports changes, to drop cached results.
+IMPORTS_CACHE_VERSION = 2
+
+# Opened on first use; False records that the cache is unavailable.
+_imports_cache = None
+
+def _get_imports_cache() -> Optional[ParseCache]:
+    global _imports_cache
+    if _imports_cache is None:
+        scope = "header" if HEADER_IMPORTS_ONLY else "all"
+        version = f"{sys.version_info[0]}.{sys.version_info[1]}:{IMPORTS_CACHE_VERSION}:{scope}"
+        _imports_cache = open_parse_cache(version, table="python_imports") or False
+    return _imports_cache or None
+
 class ImportExtractor:
     """
     A utility class that provides methods to extract import statements from
@@ -29,57 +178,58 @@ class ImportExtractor:
         """
         Extracts top-level imports from a Python file using the Abstract Syntax Tree (AST).
         This is a robust method that correctly handles complex import statements.
-        It ignores relative imports.
+        It ignores relative imports. Results for unchanged files come from the parse cache.
         """
+        cache = _get_imports_cache()
+        if cache:
+            imports = cache.get(Path(file_path).resolve())
+            if imports is not None:
+                return imports
+
         imports = set()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                tree = ast.parse(f.read(), filename=file_path)
+            # Taken before the file is read, so a save during parsing is not cached as current.
+            stat = os.stat(file_path)
+            # Parsing bytes lets the tokenizer honour PEP 263 coding cookies and skips a decode pass.
+            with open_source(file_path) as source:
+                tree = ast.parse(source, filename=file_path)
 
-            for node in ast.walk(tree):
+            statements = _iter_header_statements(tree) if HEADER_IMPORTS_ONLY else _iter_statements(tree.body)
+            for node in statements:
                 if isinstance(node, ast.Import):
                     for alias in node.names:
                         # For `import a.b.c`, we only want the top-level package `a`.
-                        imports.add(alias.name.split('.')[0])
+                        # Package names repeat across files, so one interned copy is kept.
+                        imports.add(sys.intern(alias.name.partition('.')[0]))
                 elif isinstance(node, ast.ImportFrom):
                     if node.level > 0: 
                         # This is a relative import (e.g., `from . import foo`). Ignore it.
                         pass
                     elif node.module:
                         # For `from a.b import c`, we only want the top-level package `a`.
-                        imports.add(node.module.split('.')[0])
+                        imports.add(sys.intern(node.module.partition('.')[0]))
+            if cache:
+                cache.put(Path(file_path).resolve(), False, imports, stat=stat)
         except Exception as e:
             logger.warning(f"Error parsing or reading Python file {file_path}: {e}")
-        debug_log(f"Raw imports extracted from {file_path}: {imports}")
+        debug_log("Raw imports extracted from %s: %s", file_path, imports)
         return imports
 
 
     @staticmethod
     def extract_javascript_imports(file_path: str) -> Set[str]:
         """
-        Extracts imports from JavaScript/TypeScript files using regular expressions.
-        Handles `import`, `require`, and dynamic `import()` statements.
+        Extracts imports from JavaScript/TypeScript files using tree-sitter.
+        Handles `import`, `export ... from`, `require`, and dynamic `import()` statements.
         """
         imports = set()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Regex patterns for different JS/TS import syntaxes.
-            patterns = [
-                r'import.*?from\s+[\'"]([^\'\"]+)[\'"]',
-                r'require\s*\(\s*[\'"]([^\'\"]+)[\'"]\s*\)',
-                r'import\s*\(\s*[\'"]([^\'\"]+)[\'"]\s*\)',
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    # For scoped packages like `@scope/pkg`, include the scope.
-                    pkg_name = match.split('/')[0] if not match.startswith('@') else '/'.join(match.split('/')[:2])
-                    # Ignore relative imports.
-                    if not match.startswith('.'):
-                        imports.add(pkg_name)
+            for _, match in _iter_import_sources(file_path):
+                # For scoped packages like `@scope/pkg`, include the scope.
+                pkg_name = match.split('/')[0] if not match.startswith('@') else '/'.join(match.split('/')[:2])
+                # Ignore relative imports.
+                if not match.startswith('.'):
+                    imports.add(pkg_name)
         except Exception as e:
             logger.warning(f"Error reading JavaScript file {file_path}: {e}")
         
@@ -88,18 +238,12 @@ class ImportExtractor:
     @staticmethod
     def extract_java_imports(file_path: str) -> Set[str]:
         """
-        Extracts imports from Java files using a regular expression.
+        Extracts imports from Java files using tree-sitter.
         Captures the first two parts of the import path (e.g., `java.util`).
         """
         imports = set()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            pattern = r'import\s+(?:static\s+)?([a-zA-Z_][a-zA-Z0-9_.]*)'
-            matches = re.findall(pattern, content)
-            
-            for match in matches:
+            for _, match in _iter_import_sources(file_path):
                 pkg_parts = match.split('.')
                 if len(pkg_parts) >= 2:
                     # Capture the top-level package, e.g., `java.util` from `java.util.List`
@@ -109,42 +253,29 @@ class ImportExtractor:
         
         return imports
 
-    def list_imports_tool(self, path: str, language: str = 'python', recursive: bool = True):
+    def list_imports_tool(self, path: str, language: str = 'python', recursive: bool = True, exclude_stdlib: bool = True):
         """
         The main tool method that orchestrates the import extraction for a given path and language.
+        With `exclude_stdlib`, Python standard library modules are left out of the result.
         """
         all_imports = set()
-        # Map languages to their common file extensions.
-        file_extensions = {
-            'python': ['.py'], 'javascript': ['.js', '.jsx', '.mjs'],
-            'typescript': ['.ts', '.tsx'], 'java': ['.java'],
-        }
-        
-        # Map languages to their specific extraction function.
-        extensions = file_extensions.get(language, ['.py'])
-        extract_func = {
-            'python': self.extract_python_imports,
-            # ... other languages
-        }.get(language, self.extract_python_imports)
+        extensions = FILE_EXTENSIONS.get(language, FILE_EXTENSIONS['python'])
+        extract_func = getattr(self, EXTRACTORS.get(language, EXTRACTORS['python']))
         
         try:
             path_obj = Path(path)
             if path_obj.is_file():
-                if any(str(path_obj).endswith(ext) for ext in extensions):
+                if path_obj.suffix in extensions:
                     all_imports.update(extract_func(str(path_obj)))
             elif path_obj.is_dir():
-                pattern = "**/*" if recursive else "*"
-                for ext in extensions:
-                    for file_path in path_obj.glob(f"{pattern}{ext}"):
-                        if file_path.is_file():
-                            all_imports.update(extract_func(str(file_path)))
+                for file_path in iter_source_files(path_obj, extensions, recursive):
+                    all_imports.update(extract_func(str(file_path)))
             else:
                 return {"error": f"Path {path} does not exist"}
 
             # For Python, filter out standard library modules to find third-party dependencies.
-            if language == 'python':
-                stdlib_modules = set(stdlibs.module_names)
-                all_imports = all_imports - stdlib_modules
+            if language == 'python' and exclude_stdlib:
+                all_imports.difference_update(STDLIB_MODULES)
             
             return {
                 "imports": sorted(list(all_imports)), "language": language,
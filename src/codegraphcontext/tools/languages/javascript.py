@@ -1,59 +1,45 @@
+import hashlib
+import re
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 import logging
+import sys
 import ast # Not strictly needed for JS, but kept for consistency if AST manipulation is added
 
+from ...utils.source_files import prefetch_sources
+
 logger = logging.getLogger(__name__)
 
 JS_QUERIES = {
     "functions": """
-        (function_declaration 
-            name: (identifier) @name
-            parameters: (formal_parameters) @params
-        ) @function_node
-        
-        (variable_declarator 
-            name: (identifier) @name 
-            value: (function 
+        [
+            (function_declaration
+                name: (identifier) @name
                 parameters: (formal_parameters) @params
-            ) @function_node
-        )
-        
-        (variable_declarator 
-            name: (identifier) @name 
-            value: (arrow_function 
-                parameters: (formal_parameters) @params
-            ) @function_node
-        )
-        
-        (variable_declarator 
-            name: (identifier) @name 
-            value: (arrow_function 
-                parameter: (identifier) @single_param
-            ) @function_node
-        )
-        
-        (method_definition 
-            name: (property_identifier) @name
-            parameters: (formal_parameters) @params
-        ) @function_node
-        
-        (assignment_expression
-            left: (member_expression 
-                property: (property_identifier) @name
             )
-            right: (function
+            (method_definition
+                name: (property_identifier) @name
                 parameters: (formal_parameters) @params
-            ) @function_node
+            )
+        ] @function_node
+        
+        (variable_declarator
+            name: (identifier) @name
+            value: [
+                (function parameters: (formal_parameters) @params)
+                (arrow_function parameters: (formal_parameters) @params)
+                (arrow_function parameter: (identifier) @single_param)
+            ] @function_node
         )
         
         (assignment_expression
-            left: (member_expression 
+            left: (member_expression
                 property: (property_identifier) @name
             )
-            right: (arrow_function
-                parameters: (formal_parameters) @params
-            ) @function_node
+            right: [
+                (function parameters: (formal_parameters) @params)
+                (arrow_function parameters: (formal_parameters) @params)
+            ] @function_node
         )
     """,
     "classes": """
@@ -78,73 +64,197 @@ JS_QUERIES = {
     """,
 }
 
+# Definitions gathered by the pre-scan, for resolving calls across files.
+JS_PRE_SCAN_QUERY = """
+    (class_declaration name: (identifier) @name)
+    (function_declaration name: (identifier) @name)
+    (variable_declarator name: (identifier) @name value: (function))
+    (variable_declarator name: (identifier) @name value: (arrow_function))
+    (method_definition name: (property_identifier) @name)
+    (assignment_expression
+        left: (member_expression 
+            property: (property_identifier) @name
+        )
+        right: (function)
+    )
+    (assignment_expression
+        left: (member_expression 
+            property: (property_identifier) @name
+        )
+        right: (arrow_function)
+    )
+"""
+
+# The extraction queries joined into one, so a file's tree is matched in a single
+# pass. Each capture is renamed `<query>.<capture>` (e.g. `functions.name`) so the
+# results can be split back per query. Comments are left out: JSDoc is read from
+# the source bytes, so nothing consumes the docstrings captures.
+JS_EXTRACT_QUERIES = ('functions', 'classes', 'imports', 'calls', 'variables')
+
+def _join_queries(names) -> str:
+    return "\n".join(re.sub(r'@(\w+)', rf'@{name}.\1', JS_QUERIES[name]) for name in names)
+
+JS_EXTRACT_QUERY = _join_queries(JS_EXTRACT_QUERIES)
+# Dependency files only contribute their definitions and imports to the graph;
+# calls and variables inside third-party code are not extracted.
+JS_DEPENDENCY_QUERY = _join_queries(('functions', 'classes', 'imports'))
+
+# Compiled queries per language name, shared by every parser instance and the
+# pre-scan. Keyed by name because get_language returns a new Language object on
+# each call, so the objects themselves never match.
+_compiled_queries: Dict[str, Dict[str, Any]] = {}
+
+def _get_queries(language_name: str, language) -> Dict[str, Any]:
+    queries = _compiled_queries.get(language_name)
+    if queries is None:
+        queries = {
+            'extract': language.query(JS_EXTRACT_QUERY),
+            'extract_dependency': language.query(JS_DEPENDENCY_QUERY),
+            'pre_scan': language.query(JS_PRE_SCAN_QUERY),
+        }
+        _compiled_queries[language_name] = queries
+    return queries
+
+# Node types that add a branch to a function's cyclomatic complexity.
+COMPLEXITY_NODES = frozenset({
+    "if_statement", "for_statement", "while_statement", "do_statement",
+    "switch_statement", "case_statement", "conditional_expression",
+    "logical_expression", "binary_expression", "catch_clause",
+})
+
+# COMPLEXITY_NODES as node kind ids per language name. Comparing the integer
+# kind_id skips building a type string for every node the complexity walk visits.
+_complexity_kind_ids: Dict[str, frozenset] = {}
+
+def _get_complexity_kind_ids(language_name: str, language) -> frozenset:
+    kind_ids = _complexity_kind_ids.get(language_name)
+    if kind_ids is None:
+        kind_ids = _complexity_kind_ids[language_name] = frozenset(
+            kind_id for kind_id in range(language.node_kind_count)
+            if language.node_kind_for_id(kind_id) in COMPLEXITY_NODES
+        )
+    return kind_ids
+
+# Bytes skipped between a JSDoc comment and the function it documents.
+JS_WHITESPACE = b' \t\r\n'
+
+# Enclosing node types reported as a function's context.
+CONTEXT_TYPES = frozenset({"function_declaration", "class_declaration"})
+
+def _identifier_parameter(parser, node) -> Optional[str]:
+    return parser._get_name_text(node)
+
+def _default_parameter(parser, node) -> Optional[str]:
+    # Default parameter: param = defaultValue
+    left_child = node.child_by_field_name('left')
+    if left_child and left_child.type == 'identifier':
+        return parser._get_name_text(left_child)
+    return None
+
+def _rest_parameter(parser, node) -> Optional[str]:
+    # Rest parameter: ...args
+    argument = node.child_by_field_name('argument')
+    if argument and argument.type == 'identifier':
+        return f"...{parser._get_node_text(argument)}"
+    return None
+
+# Parameter name extraction by node type; other parameter forms (destructuring) are skipped.
+PARAMETER_HANDLERS = {
+    'identifier': _identifier_parameter,
+    'assignment_pattern': _default_parameter,
+    'rest_pattern': _rest_parameter,
+}
+
 class JavascriptTreeSitterParser:
     """A JavaScript-specific parser using tree-sitter, encapsulating language-specific logic."""
 
+    # Attributes are read on every node visited; slots make those lookups direct.
+    __slots__ = ('generic_parser_wrapper', 'language_name', 'language', 'parser', 'queries', '_complexity_ids', '_skip_details', '_source')
+
     def __init__(self, generic_parser_wrapper):
         self.generic_parser_wrapper = generic_parser_wrapper
         self.language_name = generic_parser_wrapper.language_name
         self.language = generic_parser_wrapper.language
         self.parser = generic_parser_wrapper.parser
+        # Dependency files are indexed for their structure only; source text and
+        # docstrings are dropped to keep third-party nodes small.
+        self._skip_details = False
+        # Bytes of the file being parsed; node text is sliced from them.
+        self._source = b""
 
-        self.queries = {
-            name: self.language.query(query_str)
-            for name, query_str in JS_QUERIES.items()
-        }
+        self.queries = _get_queries(self.language_name, self.language)
+        self._complexity_ids = _get_complexity_kind_ids(self.language_name, self.language)
 
     def _get_node_text(self, node) -> str:
-        return node.text.decode('utf-8')
+        # Sliced from the bytes read in parse(), skipping the Node.text property.
+        return self._source[node.start_byte:node.end_byte].decode('utf-8')
+
+    def _get_name_text(self, node) -> str:
+        # Identifiers repeat heavily within and across files; keep one shared copy.
+        return sys.intern(self._get_node_text(node))
 
-    def _get_parent_context(self, node, types=('function_declaration', 'class_declaration')):
+    def _get_parent_context(self, node) -> Tuple[Optional[str], Optional[str], Optional[int]]:
         # JS specific context types
         curr = node.parent
         while curr:
-            if curr.type in types:
+            if curr.type in CONTEXT_TYPES:
                 name_node = curr.child_by_field_name('name')
                 return self._get_node_text(name_node) if name_node else None, curr.type, curr.start_point[0] + 1
             curr = curr.parent
         return None, None, None
 
-    def _calculate_complexity(self, node):
-        # JS specific complexity nodes
-        complexity_nodes = {
-            "if_statement", "for_statement", "while_statement", "do_statement",
-            "switch_statement", "case_statement", "conditional_expression",
-            "logical_expression", "binary_expression", "catch_clause"
-        }
+    def _calculate_complexity(self, node) -> int:
+        """
+        Cyclomatic complexity of `node`: one plus the branching nodes beneath it,
+        counted with an iterative TreeCursor walk rather than recursing over
+        `children` lists.
+        """
+        complexity_ids = self._complexity_ids
         count = 1
-        
-        def traverse(n):
-            nonlocal count
-            if n.type in complexity_nodes:
+        cursor = node.walk()
+        while True:
+            if cursor.node.kind_id in complexity_ids:
                 count += 1
-            for child in n.children:
-                traverse(child)
-        
-        traverse(node)
-        return count
+            if cursor.goto_first_child():
+                continue
+            # The cursor is rooted at `node`, so climbing past it fails and ends the walk.
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return count
 
-    def _get_docstring(self, body_node):
+    def _get_docstring(self, body_node) -> Optional[str]:
         # JS specific docstring extraction (e.g., JSDoc comments)
         # This is a placeholder and needs more sophisticated logic
         return None
 
     def parse(self, file_path: Path, is_dependency: bool = False) -> Dict:
         """Parses a file and returns its structure in a standardized dictionary format."""
-        with open(file_path, "r", encoding="utf-8") as f:
-            source_code = f.read()
-        
-        tree = self.parser.parse(bytes(source_code, "utf8"))
+        # tree-sitter parses bytes, so the file is never decoded as a whole.
+        with open(file_path, "rb") as f:
+            self._source = f.read()
+
+        tree = self.parser.parse(self._source)
         root_node = tree.root_node
+        self._skip_details = is_dependency
 
-        functions = self._find_functions(root_node)
-        classes = self._find_classes(root_node)
-        imports = self._find_imports(root_node)
-        function_calls = self._find_calls(root_node)
-        variables = self._find_variables(root_node)
+        # One query pass over the tree; captures are handed to each extractor by query name.
+        captures = {name: [] for name in JS_EXTRACT_QUERIES}
+        query = self.queries['extract_dependency' if is_dependency else 'extract']
+        for node, capture_name in query.captures(root_node):
+            query_name, _, capture_name = capture_name.partition('.')
+            captures[query_name].append((node, capture_name))
+
+        functions = self._find_functions(captures['functions'])
+        classes = self._find_classes(captures['classes'])
+        imports = self._find_imports(captures['imports'])
+        function_calls = self._find_calls(captures['calls'])
+        variables = self._find_variables(captures['variables'])
+        content_sha = hashlib.sha256(self._source).hexdigest()
+        self._source = b""
 
         return {
             "file_path": str(file_path),
+            "content_sha": content_sha,
             "functions": functions,
             "classes": classes,
             "variables": variables,
@@ -154,62 +264,30 @@ class JavascriptTreeSitterParser:
             "lang": self.language_name,
         }
 
-    def _find_functions(self, root_node):
+    def _find_functions(self, captures):
         functions = []
-        query = self.queries['functions']
         
-        # Collect all captures and group them by the function they belong to
+        # Collect all captures and group them by the function they belong to.
+        # Nodes are keyed by `node.id`: every capture returns fresh Node objects,
+        # so Python object identity would never match the same syntax node twice.
         captures_by_function = {}
         
-        for node, capture_name in query.captures(root_node):
-            if capture_name == 'function_node':
-                func_id = id(node)
-                if func_id not in captures_by_function:
-                    captures_by_function[func_id] = {
-                        'node': node,
-                        'name': None,
-                        'params': None,
-                        'single_param': None
-                    }
-            elif capture_name == 'name':
-                # Find which function this name belongs to
-                func_node = self._find_function_node_for_name(node)
-                if func_node:
-                    func_id = id(func_node)
-                    if func_id not in captures_by_function:
-                        captures_by_function[func_id] = {
-                            'node': func_node,
-                            'name': None,
-                            'params': None,
-                            'single_param': None
-                        }
-                    captures_by_function[func_id]['name'] = self._get_node_text(node)
-            elif capture_name == 'params':
-                # Find which function these params belong to
-                func_node = self._find_function_node_for_params(node)
-                if func_node:
-                    func_id = id(func_node)
-                    if func_id not in captures_by_function:
-                        captures_by_function[func_id] = {
-                            'node': func_node,
-                            'name': None,
-                            'params': None,
-                            'single_param': None
-                        }
-                    captures_by_function[func_id]['params'] = node
-            elif capture_name == 'single_param':
-                # Find which function this single param belongs to
-                func_node = self._find_function_node_for_params(node)
-                if func_node:
-                    func_id = id(func_node)
-                    if func_id not in captures_by_function:
-                        captures_by_function[func_id] = {
-                            'node': func_node,
-                            'name': None,
-                            'params': None,
-                            'single_param': None
-                        }
-                    captures_by_function[func_id]['single_param'] = node
+        for node, capture_name in captures:
+            func_node = node if capture_name == 'function_node' else self._owning_function(node, capture_name)
+            if func_node is None:
+                continue
+            data = captures_by_function.get(func_node.id)
+            if data is None:
+                data = captures_by_function[func_node.id] = {
+                    'node': func_node,
+                    'name': None,
+                    'params': None,
+                    'single_param': None
+                }
+            if capture_name == 'name':
+                data['name'] = self._get_name_text(node)
+            elif capture_name in ('params', 'single_param'):
+                data[capture_name] = node
         
         # Process each function
         for func_id, data in captures_by_function.items():
@@ -217,102 +295,103 @@ class JavascriptTreeSitterParser:
                 func_node = data['node']
                 name = data['name']
                 
-                # Extract parameters
-                args = []
+                # Extract parameters. Records are built once and only read
+                # afterwards, so fixed-size fields are stored as tuples.
+                args = ()
                 if data['params']:
                     args = self._extract_parameters(data['params'])
                 elif data['single_param']:
-                    args = [self._get_node_text(data['single_param'])]
+                    args = (self._get_name_text(data['single_param']),)
                 
                 # Get context information
                 context, context_type, context_line = self._get_parent_context(func_node)
                 class_context = context if context_type == 'class_declaration' else None
                 
                 # Extract JSDoc comment if available
-                docstring = self._get_jsdoc_comment(func_node)
+                docstring = None if self._skip_details else self._get_jsdoc_comment(func_node)
+                source = None if self._skip_details else self._get_node_text(func_node)
                 
                 func_data = {
                     "name": name,
                     "line_number": func_node.start_point[0] + 1,
                     "end_line": func_node.end_point[0] + 1,
                     "args": args,
-                    "source": self._get_node_text(func_node),
-                    "source_code": self._get_node_text(func_node),
+                    "source": source,
+                    "source_code": source,
                     "docstring": docstring,
                     "cyclomatic_complexity": self._calculate_complexity(func_node),
                     "context": context,
                     "context_type": context_type,
                     "class_context": class_context,
-                    "decorators": [],  # JS doesn't have decorators like Python
-                    "lang": self.language_name,
-                    "is_dependency": False,
+                    "decorators": (),  # JS doesn't have decorators like Python
                 }
                 functions.append(func_data)
         
         return functions
     
-    def _find_function_node_for_name(self, name_node):
-        """Find the function node that contains this name node."""
-        current = name_node.parent
-        while current:
-            if current.type in ('function_declaration', 'function', 'arrow_function', 'method_definition'):
-                return current
-            elif current.type in ('variable_declarator', 'assignment_expression'):
-                # Check if this declarator/assignment contains a function
-                for child in current.children:
-                    if child.type in ('function', 'arrow_function'):
-                        return child
-            current = current.parent
-        return None
-    
-    def _find_function_node_for_params(self, params_node):
-        """Find the function node that contains this parameters node."""
-        current = params_node.parent
-        while current:
-            if current.type in ('function_declaration', 'function', 'arrow_function', 'method_definition'):
-                return current
-            current = current.parent
-        return None
+    def _owning_function(self, node, capture_name):
+        """
+        Returns the function node a `name`, `params` or `single_param` capture
+        belongs to. The function query fixes where each capture sits, so this is
+        at most two steps up the tree rather than a walk to the nearest function.
+        """
+        parent = node.parent
+        if capture_name == 'name':
+            # `obj.prop = function () {}` names the function through a member expression.
+            if parent.type == 'member_expression':
+                parent = parent.parent
+            if parent.type == 'variable_declarator':
+                return parent.child_by_field_name('value')
+            if parent.type == 'assignment_expression':
+                return parent.child_by_field_name('right')
+        # Declarations and methods own their name; parameters belong to their parent.
+        return parent
     
-    def _extract_parameters(self, params_node):
-        """Extract parameter names from formal_parameters node."""
+    def _extract_parameters(self, params_node) -> Tuple[str, ...]:
+        """Extract parameter names from a formal_parameters node."""
+        # named_children skips the parentheses and commas between parameters.
         params = []
-        if params_node.type == 'formal_parameters':
-            for child in params_node.children:
-                if child.type == 'identifier':
-                    params.append(self._get_node_text(child))
-                elif child.type == 'assignment_pattern':
-                    # Default parameter: param = defaultValue
-                    left_child = child.child_by_field_name('left')
-                    if left_child and left_child.type == 'identifier':
-                        params.append(self._get_node_text(left_child))
-                elif child.type == 'rest_pattern':
-                    # Rest parameter: ...args
-                    argument = child.child_by_field_name('argument')
-                    if argument and argument.type == 'identifier':
-                        params.append(f"...{self._get_node_text(argument)}")
-        return params
+        for child in params_node.named_children:
+            handler = PARAMETER_HANDLERS.get(child.type)
+            if handler:
+                param = handler(self, child)
+                if param:
+                    params.append(param)
+        return tuple(params)
     
     def _get_jsdoc_comment(self, func_node):
-        """Extract JSDoc comment preceding the function."""
-        # Look for comments before the function
-        prev_sibling = func_node.prev_sibling
-        while prev_sibling and prev_sibling.type in ('comment', '\n', ' '):
-            if prev_sibling.type == 'comment':
-                comment_text = self._get_node_text(prev_sibling)
-                if comment_text.startswith('/**') and comment_text.endswith('*/'):
-                    return comment_text.strip()
-            prev_sibling = prev_sibling.prev_sibling
-        return None
+        """
+        Extract the JSDoc comment directly preceding the function, searching the
+        source bytes backwards instead of walking sibling nodes. Whitespace,
+        whole-line `//` comments and plain `/* */` blocks (e.g. `/* eslint-disable */`)
+        may separate the comment from the function.
+        """
+        source = self._source
+        end = func_node.start_byte
+        while True:
+            while end and source[end - 1] in JS_WHITESPACE:
+                end -= 1
+            line_start = source.rfind(b'\n', 0, end) + 1
+            if source[line_start:end].lstrip().startswith(b'//'):
+                end = line_start
+                continue
+            # A block must end exactly where the gap does, and contain no other `*/`.
+            if not source.endswith(b'*/', 0, end):
+                return None
+            start = source.rfind(b'/*', 0, end - 2)
+            if start == -1 or source.find(b'*/', start + 2) != end - 2:
+                return None
+            if source.startswith(b'/**', start):
+                return source[start:end].decode('utf-8').strip()
+            end = start
 
-    def _find_classes(self, root_node):
+    def _find_classes(self, captures):
         classes = []
-        query = self.queries['classes']
-        for class_node, capture_name in query.captures(root_node):
+        for class_node, capture_name in captures:
             if capture_name == 'class':
                 name_node = class_node.child_by_field_name('name')
                 if not name_node: continue
-                name = self._get_node_text(name_node)
+                name = self._get_name_text(name_node)
 
                 bases = []
                 heritage_node = next((child for child in class_node.children if child.type == 'class_heritage'), None)
@@ -330,20 +409,17 @@ class JavascriptTreeSitterParser:
                     "line_number": class_node.start_point[0] + 1,
                     "end_line": class_node.end_point[0] + 1,
                     "bases": bases,
-                    "source": self._get_node_text(class_node),
-                    "docstring": self._get_docstring(class_node),
+                    "source": None if self._skip_details else self._get_node_text(class_node),
+                    "docstring": None if self._skip_details else self._get_docstring(class_node),
                     "context": None,
                     "decorators": [],
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 classes.append(class_data)
         return classes
 
-    def _find_imports(self, root_node):
+    def _find_imports(self, captures):
         imports = []
-        query = self.queries['imports']
-        for node, capture_name in query.captures(root_node):
+        for node, capture_name in captures:
             if capture_name != 'import':
                 continue
 
@@ -355,20 +431,20 @@ class JavascriptTreeSitterParser:
                 # Look for different import structures
                 import_clause = node.child_by_field_name('import')
                 if not import_clause:
-                    imports.append({'name': source, 'source': source, 'alias': None, 'line_number': line_number, 'lang': self.language_name})
+                    imports.append({'name': source, 'source': source, 'alias': None, 'line_number': line_number})
                     continue
 
                 # Default import: import defaultExport from '...'
                 if import_clause.type == 'identifier':
                     alias = self._get_node_text(import_clause)
-                    imports.append({'name': 'default', 'source': source, 'alias': alias, 'line_number': line_number, 'lang': self.language_name})
+                    imports.append({'name': 'default', 'source': source, 'alias': alias, 'line_number': line_number})
 
                 # Namespace import: import * as name from '...'
                 elif import_clause.type == 'namespace_import':
                     alias_node = import_clause.child_by_field_name('alias')
                     if alias_node:
                         alias = self._get_node_text(alias_node)
-                        imports.append({'name': '*', 'source': source, 'alias': alias, 'line_number': line_number, 'lang': self.language_name})
+                        imports.append({'name': '*', 'source': source, 'alias': alias, 'line_number': line_number})
 
                 # Named imports: import { name, name as alias } from '...'
                 elif import_clause.type == 'named_imports':
@@ -378,7 +454,7 @@ class JavascriptTreeSitterParser:
                             alias_node = specifier.child_by_field_name('alias')
                             original_name = self._get_node_text(name_node)
                             alias = self._get_node_text(alias_node) if alias_node else None
-                            imports.append({'name': original_name, 'source': source, 'alias': alias, 'line_number': line_number, 'lang': self.language_name})
+                            imports.append({'name': original_name, 'source': source, 'alias': alias, 'line_number': line_number})
 
             elif node.type == 'call_expression': # require('...')
                 args = node.child_by_field_name('arguments')
@@ -392,18 +468,17 @@ class JavascriptTreeSitterParser:
                     alias_node = node.parent.child_by_field_name('name')
                     if alias_node:
                         alias = self._get_node_text(alias_node)
-                imports.append({'name': source, 'source': source, 'alias': alias, 'line_number': line_number, 'lang': self.language_name})
+                imports.append({'name': source, 'source': source, 'alias': alias, 'line_number': line_number})
 
         return imports
 
-    def _find_calls(self, root_node):
+    def _find_calls(self, captures):
         calls = []
-        query = self.queries['calls']
-        for node, capture_name in query.captures(root_node):
+        for node, capture_name in captures:
             # Placeholder for JS call extraction logic
             if capture_name == 'name':
                 call_node = node.parent
-                name = self._get_node_text(node)
+                name = self._get_name_text(node)
                 
                 # Simplified args extraction for now
                 args = []
@@ -416,23 +491,20 @@ class JavascriptTreeSitterParser:
                     "inferred_obj_type": None,
                     "context": None, # Placeholder
                     "class_context": None, # Placeholder
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 calls.append(call_data)
         return calls
 
-    def _find_variables(self, root_node):
+    def _find_variables(self, captures):
         variables = []
-        query = self.queries['variables']
-        for match in query.captures(root_node):
+        for match in captures:
             capture_name = match[1]
             node = match[0]
 
             # Placeholder for JS variable extraction logic
             if capture_name == 'name':
                 var_node = node.parent
-                name = self._get_node_text(node)
+                name = self._get_name_text(node)
                 value = None # Placeholder
                 type_text = None # Placeholder
 
@@ -443,8 +515,6 @@ class JavascriptTreeSitterParser:
                     "type": type_text,
                     "context": None, # Placeholder
                     "class_context": None, # Placeholder
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 variables.append(variable_data)
         return variables
@@ -452,37 +522,18 @@ class JavascriptTreeSitterParser:
 def pre_scan_javascript(files: list[Path], parser_wrapper) -> dict:
     """Scans JavaScript files to create a map of class/function names to their file paths."""
     imports_map = {}
-    query_str = """
-        (class_declaration name: (identifier) @name)
-        (function_declaration name: (identifier) @name)
-        (variable_declarator name: (identifier) @name value: (function))
-        (variable_declarator name: (identifier) @name value: (arrow_function))
-        (method_definition name: (property_identifier) @name)
-        (assignment_expression
-            left: (member_expression 
-                property: (property_identifier) @name
-            )
-            right: (function)
-        )
-        (assignment_expression
-            left: (member_expression 
-                property: (property_identifier) @name
-            )
-            right: (arrow_function)
-        )
-    """
-    query = parser_wrapper.language.query(query_str)
+    query = _get_queries(parser_wrapper.language_name, parser_wrapper.language)['pre_scan']
     
-    for file_path in files:
+    # Upcoming files are read on a thread pool while the current one is parsed.
+    for file_path, source in prefetch_sources(files):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                tree = parser_wrapper.parser.parse(bytes(f.read(), "utf8"))
-            
+            if isinstance(source, Exception):
+                raise source
+            tree = parser_wrapper.parser.parse(source)
+
+            resolved_path = sys.intern(str(file_path.resolve()))
             for capture, _ in query.captures(tree.root_node):
-                name = capture.text.decode('utf-8')
-                if name not in imports_map:
-                    imports_map[name] = []
-                imports_map[name].append(str(file_path.resolve()))
+                imports_map.setdefault(capture.text.decode('utf-8'), []).append(resolved_path)
         except Exception as e:
             logger.warning(f"Tree-sitter pre-scan failed for {file_path}: {e}")
     return imports_map
@@ -1,10 +1,31 @@
+import hashlib
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 import logging
+import sys
 import ast
+import builtins
+
+from ...utils.source_files import prefetch_sources
 
 logger = logging.getLogger(__name__)
 
+# Node types that add a decision point to a function's cyclomatic complexity.
+COMPLEXITY_NODES = frozenset({
+    "if_statement", "for_statement", "while_statement", "except_clause",
+    "with_statement", "boolean_operator", "list_comprehension",
+    "generator_expression", "case_clause",
+})
+
+# Variable values longer than this many bytes are truncated; large literals are
+# kept for display only and are never queried structurally.
+VARIABLE_VALUE_LIMIT = 200
+
+# Calls to these names are never linked, so they are dropped at parse time. Built
+# from the module because `__builtins__` is a dict or a module depending on how
+# this file was loaded.
+BUILTIN_NAMES = frozenset(dir(builtins))
+
 PY_QUERIES = {
     "imports": """
         (import_statement name: (_) @import)
@@ -43,51 +64,111 @@ PY_QUERIES = {
     """,
 }
 
+# Definitions gathered by the pre-scan, for resolving calls across files.
+PY_PRE_SCAN_QUERY = """
+    (class_definition name: (identifier) @name)
+    (function_definition name: (identifier) @name)
+"""
+
+# Compiled queries per language name, shared by every parser instance and the
+# pre-scan. Keyed by name because get_language returns a new Language object on
+# each call, so the objects themselves never match.
+_compiled_queries: Dict[str, Dict[str, Any]] = {}
+
+def _get_queries(language_name: str, language) -> Dict[str, Any]:
+    queries = _compiled_queries.get(language_name)
+    if queries is None:
+        queries = {name: language.query(query_str) for name, query_str in PY_QUERIES.items()}
+        queries['pre_scan'] = language.query(PY_PRE_SCAN_QUERY)
+        _compiled_queries[language_name] = queries
+    return queries
+
 class PythonTreeSitterParser:
     """A Python-specific parser using tree-sitter, encapsulating language-specific logic."""
 
+    # Attributes are read on every node visited; slots make those lookups direct.
+    __slots__ = (
+        'generic_parser_wrapper', 'language_name', 'language', 'parser', 'queries',
+        '_context_cache', '_skip_details', '_source',
+    )
+
     def __init__(self, generic_parser_wrapper):
         self.generic_parser_wrapper = generic_parser_wrapper
         self.language_name = generic_parser_wrapper.language_name
         self.language = generic_parser_wrapper.language
         self.parser = generic_parser_wrapper.parser
 
-        self.queries = {
-            name: self.language.query(query_str)
-            for name, query_str in PY_QUERIES.items()
-        }
+        self.queries = _get_queries(self.language_name, self.language)
+        # Enclosing-scope lookups, memoized for the duration of a single parse().
+        self._context_cache = {}
+        # Dependency files skip source text and docstrings; set per parse().
+        self._skip_details = False
+        # Bytes of the file being parsed, for slicing text without materializing whole nodes.
+        self._source = b""
 
     def _get_node_text(self, node) -> str:
-        return node.text.decode('utf-8')
-
-    def _get_parent_context(self, node, types=('function_definition', 'class_definition')):
+        # Sliced from the bytes read in parse(), skipping the Node.text property.
+        return self._source[node.start_byte:node.end_byte].decode('utf-8')
+
+    def _get_value_text(self, node, limit: int = VARIABLE_VALUE_LIMIT) -> str:
+        # Slice only the bytes that are kept rather than the whole node's text.
+        if node.end_byte - node.start_byte <= limit:
+            return self._get_node_text(node)
+        return self._source[node.start_byte:node.start_byte + limit].decode('utf-8', errors='ignore') + '...'
+
+    def _get_parent_context(self, node, types: Tuple[str, ...] = ('function_definition', 'class_definition')) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        # Every ancestor walked on the way up shares the same answer, so it is cached
+        # for them too; later nodes in the same scope stop at the first cached ancestor.
+        cache = self._context_cache
+        visited = []
+        result = (None, None, None)
         curr = node.parent
         while curr:
+            key = (curr.id, types)
+            if key in cache:
+                result = cache[key]
+                break
+            visited.append(key)
             if curr.type in types:
                 name_node = curr.child_by_field_name('name')
-                return self._get_node_text(name_node) if name_node else None, curr.type, curr.start_point[0] + 1
+                result = (self._get_node_text(name_node) if name_node else None, curr.type, curr.start_point[0] + 1)
+                break
             curr = curr.parent
-        return None, None, None
-
-    def _calculate_complexity(self, node):
-        complexity_nodes = {
-            "if_statement", "for_statement", "while_statement", "except_clause",
-            "with_statement", "boolean_operator", "list_comprehension", 
-            "generator_expression", "case_clause"
-        }
-        count = 1
-        
-        def traverse(n):
-            nonlocal count
-            if n.type in complexity_nodes:
-                count += 1
-            for child in n.children:
-                traverse(child)
-        
-        traverse(node)
-        return count
-
-    def _get_docstring(self, body_node):
+        for key in visited:
+            cache[key] = result
+        return result
+
+    def _calculate_complexities(self, root_node) -> Dict[int, int]:
+        """
+        Cyclomatic complexity of every function in the file, keyed by node id, from a
+        single walk of the tree. A decision point counts towards every enclosing
+        function, so an outer function includes the branches of nested ones.
+        """
+        counts: Dict[int, int] = {}
+        enclosing = []  # (function node id, depth) for the functions above the cursor
+        cursor = root_node.walk()
+        depth = 0
+        while True:
+            node = cursor.node
+            while enclosing and enclosing[-1][1] >= depth:
+                enclosing.pop()
+            node_type = node.type
+            if node_type in COMPLEXITY_NODES:
+                for func_id, _ in enclosing:
+                    counts[func_id] += 1
+            elif node_type == 'function_definition':
+                counts[node.id] = 1
+                enclosing.append((node.id, depth))
+
+            if cursor.goto_first_child():
+                depth += 1
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return counts
+                depth -= 1
+
+    def _get_docstring(self, body_node) -> Optional[str]:
         if body_node and body_node.child_count > 0:
             first_child = body_node.children[0]
             if first_child.type == 'expression_statement' and first_child.children[0].type == 'string':
@@ -99,11 +180,14 @@ class PythonTreeSitterParser:
 
     def parse(self, file_path: Path, is_dependency: bool = False) -> Dict:
         """Parses a file and returns its structure in a standardized dictionary format."""
-        with open(file_path, "r", encoding="utf-8") as f:
-            source_code = f.read()
-        
-        tree = self.parser.parse(bytes(source_code, "utf8"))
+        # tree-sitter parses bytes, so the file is never decoded as a whole.
+        with open(file_path, "rb") as f:
+            self._source = f.read()
+
+        tree = self.parser.parse(self._source)
         root_node = tree.root_node
+        self._context_cache = {}
+        self._skip_details = is_dependency
 
         functions = self._find_functions(root_node)
         functions.extend(self._find_lambda_assignments(root_node))
@@ -111,9 +195,12 @@ class PythonTreeSitterParser:
         imports = self._find_imports(root_node)
         function_calls = self._find_calls(root_node)
         variables = self._find_variables(root_node)
+        content_sha = hashlib.sha256(self._source).hexdigest()
+        self._source = b""
 
         return {
             "file_path": str(file_path),
+            "content_sha": content_sha,
             "functions": functions,
             "classes": classes,
             "variables": variables,
@@ -141,27 +228,28 @@ class PythonTreeSitterParser:
                 context, context_type, _ = self._get_parent_context(assignment_node)
                 class_context, _, _ = self._get_parent_context(assignment_node, types=('class_definition',))
 
+                source = None if self._skip_details else self._get_node_text(assignment_node)
+
                 func_data = {
                     "name": name,
                     "line_number": node.start_point[0] + 1,
                     "end_line": assignment_node.end_point[0] + 1,
                     "args": [p for p in [self._get_node_text(p) for p in params_node.children if p.type == 'identifier'] if p] if params_node else [],
-                    "source": self._get_node_text(assignment_node),
-                    "source_code": self._get_node_text(assignment_node),
+                    "source": source,
+                    "source_code": source,
                     "docstring": None,
                     "cyclomatic_complexity": 1,
                     "context": context,
                     "context_type": context_type,
                     "class_context": class_context,
                     "decorators": [],
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 functions.append(func_data)
         return functions
 
     def _find_functions(self, root_node):
         functions = []
+        complexities = self._calculate_complexities(root_node)
         query = self.queries['functions']
         for match in query.captures(root_node):
             capture_name = match[1]
@@ -191,21 +279,21 @@ class PythonTreeSitterParser:
                         if arg_text:
                             args.append(arg_text)
 
+                source = None if self._skip_details else self._get_node_text(func_node)
+
                 func_data = {
                     "name": name,
                     "line_number": node.start_point[0] + 1,
                     "end_line": func_node.end_point[0] + 1,
                     "args": args,
-                    "source": self._get_node_text(func_node),
-                    "source_code": self._get_node_text(func_node),
-                    "docstring": self._get_docstring(body_node),
-                    "cyclomatic_complexity": self._calculate_complexity(func_node),
+                    "source": source,
+                    "source_code": source,
+                    "docstring": None if self._skip_details else self._get_docstring(body_node),
+                    "cyclomatic_complexity": complexities.get(func_node.id, 1),
                     "context": context,
                     "context_type": context_type,
                     "class_context": class_context,
                     "decorators": [d for d in decorators if d],
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 functions.append(func_data)
         return functions
@@ -236,12 +324,10 @@ class PythonTreeSitterParser:
                     "line_number": node.start_point[0] + 1,
                     "end_line": class_node.end_point[0] + 1,
                     "bases": [b for b in bases if b],
-                    "source": self._get_node_text(class_node),
-                    "docstring": self._get_docstring(body_node),
+                    "source": None if self._skip_details else self._get_node_text(class_node),
+                    "docstring": None if self._skip_details else self._get_docstring(body_node),
                     "context": context,
                     "decorators": [d for d in decorators if d],
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 classes.append(class_data)
         return classes
@@ -273,8 +359,6 @@ class PythonTreeSitterParser:
                         "line_number": node.start_point[0] + 1,
                         "alias": alias,
                         "context": self._get_parent_context(node)[:2],
-                        "lang": self.language_name,
-                        "is_dependency": False,
                     }
                     imports.append(import_data)
                 # For 'import_from_statement'
@@ -309,8 +393,6 @@ class PythonTreeSitterParser:
                                     "line_number": child.start_point[0] + 1,
                                     "alias": alias,
                                     "context": self._get_parent_context(child)[:2],
-                                    "lang": self.language_name,
-                                    "is_dependency": False,
                                 })
 
         return imports
@@ -320,27 +402,29 @@ class PythonTreeSitterParser:
         query = self.queries['calls']
         for node, capture_name in query.captures(root_node):
             if capture_name == 'name':
+                name = self._get_node_text(node)
+                if name in BUILTIN_NAMES:
+                    continue
                 call_node = node.parent if node.parent.type == 'call' else node.parent.parent
                 full_call_node = call_node.child_by_field_name('function')
                 
+                # Only named children are real arguments; the anonymous "(", ","
+                # and ")" tokens are skipped without materializing their text.
                 args = []
                 arguments_node = call_node.child_by_field_name('arguments')
                 if arguments_node:
-                    for arg in arguments_node.children:
-                        arg_text = self._get_node_text(arg)
-                        if arg_text is not None:
-                            args.append(arg_text)
+                    for arg in arguments_node.named_children:
+                        if arg.type != 'comment':
+                            args.append(self._get_node_text(arg))
 
                 call_data = {
-                    "name": self._get_node_text(node),
+                    "name": name,
                     "full_name": self._get_node_text(full_call_node),
                     "line_number": node.start_point[0] + 1,
                     "args": args,
                     "inferred_obj_type": None, # Type inference is a complex topic to be added
                     "context": self._get_parent_context(node),
                     "class_context": self._get_parent_context(node, types=('class_definition',))[:2],
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 calls.append(call_data)
         return calls
@@ -361,7 +445,7 @@ class PythonTreeSitterParser:
                     continue
 
                 name = self._get_node_text(node)
-                value = self._get_node_text(right_node) if right_node else None
+                value = self._get_value_text(right_node) if right_node else None
                 
                 type_node = assignment_node.child_by_field_name('type')
                 type_text = self._get_node_text(type_node) if type_node else None
@@ -376,8 +460,6 @@ class PythonTreeSitterParser:
                     "type": type_text,
                     "context": context,
                     "class_context": class_context,
-                    "lang": self.language_name,
-                    "is_dependency": False,
                 }
                 variables.append(variable_data)
         return variables
@@ -385,22 +467,18 @@ class PythonTreeSitterParser:
 def pre_scan_python(files: list[Path], parser_wrapper) -> dict:
     """Scans Python files to create a map of class/function names to their file paths."""
     imports_map = {}
-    query_str = """
-        (class_definition name: (identifier) @name)
-        (function_definition name: (identifier) @name)
-    """
-    query = parser_wrapper.language.query(query_str)
+    query = _get_queries(parser_wrapper.language_name, parser_wrapper.language)['pre_scan']
     
-    for file_path in files:
+    # Upcoming files are read on a thread pool while the current one is parsed.
+    for file_path, source in prefetch_sources(files):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                tree = parser_wrapper.parser.parse(bytes(f.read(), "utf8"))
-            
+            if isinstance(source, Exception):
+                raise source
+            tree = parser_wrapper.parser.parse(source)
+
+            resolved_path = sys.intern(str(file_path.resolve()))
             for capture, _ in query.captures(tree.root_node):
-                name = capture.text.decode('utf-8')
-                if name not in imports_map:
-                    imports_map[name] = []
-                imports_map[name].append(str(file_path.resolve()))
+                imports_map.setdefault(capture.text.decode('utf-8'), []).append(resolved_path)
         except Exception as e:
             logger.warning(f"Tree-sitter pre-scan failed for {file_path}: {e}")
     return imports_map
\ No newline at end of file
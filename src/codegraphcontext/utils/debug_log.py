@@ -1,10 +1,49 @@
+import atexit
 import os
+import queue
+import threading
 from datetime import datetime
 
-def debug_log(message):
-    """Write debug message to a file"""
-    debug_file = os.path.expanduser("~/mcp_debug.log")
+DEBUG_LOG_PATH = os.path.expanduser("~/mcp_debug.log")
+
+# Debug logging is off unless CGC_DEBUG=1 is set when the process starts.
+DEBUG_ENABLED = os.environ.get("CGC_DEBUG") == "1"
+
+# Messages are handed to a background thread that owns the log file, so callers
+# never wait on disk. It writes in batches and flushes whenever the queue runs dry.
+_log_queue = queue.Queue()
+_log_thread = None
+_log_thread_lock = threading.Lock()
+
+def _drain_log_queue():
+    with open(DEBUG_LOG_PATH, "a", buffering=8192) as f:
+        for line in iter(_log_queue.get, None):
+            f.write(line)
+            if _log_queue.empty():
+                f.flush()
+
+def _stop_log_thread():
+    _log_queue.put(None)
+    _log_thread.join(timeout=5)
+
+def _ensure_log_thread():
+    global _log_thread
+    with _log_thread_lock:
+        if _log_thread is None:
+            _log_thread = threading.Thread(target=_drain_log_queue, name="debug-log", daemon=True)
+            _log_thread.start()
+            atexit.register(_stop_log_thread)
+
+def debug_log(message, *args):
+    """
+    Write debug message to a file when CGC_DEBUG=1. Extra args are %-formatted into
+    the message, only when it is actually written.
+    """
+    if not DEBUG_ENABLED:
+        return
+    if args:
+        message = message % args
+    if _log_thread is None:
+        _ensure_log_thread()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(debug_file, "a") as f:
-        f.write(f"[{timestamp}] {message}\n")
-        f.flush()
+    _log_queue.put(f"[{timestamp}] {message}\n")
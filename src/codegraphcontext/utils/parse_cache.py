@@ -0,0 +1,170 @@
+# src/codegraphcontext/utils/parse_cache.py
+"""
+This module provides an on-disk cache of parser results, so files that have not
+changed since they were last indexed are not parsed again.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Set CGC_PARSE_CACHE to a file path to relocate the cache, or to "off" to disable it.
+DEFAULT_CACHE_PATH = Path.home() / ".codegraphcontext" / "parse_cache.sqlite3"
+
+# Bump when the table layout changes; a cache file written with another layout is emptied.
+SCHEMA_VERSION = 2
+
+# Processes opening a new cache file together can briefly see it half set up.
+OPEN_ATTEMPTS = 5
+
+class ParseCache:
+    """
+    Maps a source file to the result computed from it (e.g. the `file_data` its
+    parser produced), keyed by path. Each kind of result lives in its own `table`.
+
+    An entry is reused when the file's mtime and size are unchanged; if only the
+    mtime moved, the SHA-256 of the contents decides. Entries written under a
+    different `version` are ignored, so changing the producer invalidates them all.
+    """
+
+    def __init__(self, db_path: Path, version: str, table: str = "parse_cache"):
+        self.version = version
+        self.table = table
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Connections inherited from a parent process across fork(). They are kept
+        # referenced, never used or closed, so the child cannot touch the parent's handle.
+        self._inherited_conns = []
+        self._connect()
+
+    def _connect(self):
+        # SQLite connections must not cross fork(); `_pid` records which process owns `conn`.
+        self._pid = os.getpid()
+        # The watcher parses from timer threads, so access is serialized by a lock.
+        # A fresh lock is made too, as an inherited one may have been held mid-fork.
+        self._lock = threading.Lock()
+        for attempt in range(OPEN_ATTEMPTS):
+            self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            try:
+                self._setup()
+                return
+            except sqlite3.DatabaseError:
+                self.conn.close()
+                if attempt == OPEN_ATTEMPTS - 1:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    def _setup(self):
+        # WAL lets worker processes read while another one writes.
+        if self.conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        # The layout check and any migration run in one write transaction, so processes
+        # opening the cache together cannot interleave a drop with another's create.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                tables = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+                for (name,) in tables:
+                    self.conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    path TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    is_dependency INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            """.format(table=self.table))
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def _check_owner(self):
+        """Reconnects when used from a process forked after the cache was opened."""
+        if self._pid != os.getpid():
+            self._inherited_conns.append(self.conn)
+            self._connect()
+
+    @staticmethod
+    def _sha256(file_path: Path) -> str:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def get(self, file_path: Path, is_dependency: bool = False) -> Optional[Any]:
+        """Returns the cached data for `file_path`, or None if it must be parsed."""
+        try:
+            self._check_owner()
+            with self._lock:
+                return self._get(file_path, is_dependency)
+        except Exception as e:
+            logger.warning(f"Parse cache lookup failed for {file_path}: {e}")
+            return None
+
+    def _get(self, file_path: Path, is_dependency: bool) -> Optional[Any]:
+        row = self.conn.execute(
+            f"SELECT version, is_dependency, mtime_ns, size, sha256, payload FROM {self.table} WHERE path = ?",
+            (str(file_path),),
+        ).fetchone()
+        if row is None or row[0] != self.version or bool(row[1]) != is_dependency:
+            return None
+
+        stat = file_path.stat()
+        if (row[2], row[3]) != (stat.st_mtime_ns, stat.st_size):
+            # Touched but possibly unchanged: compare contents before giving up.
+            if row[3] != stat.st_size or row[4] != self._sha256(file_path):
+                return None
+            self.conn.execute(
+                f"UPDATE {self.table} SET mtime_ns = ? WHERE path = ?",
+                (stat.st_mtime_ns, str(file_path)),
+            )
+            self.conn.commit()
+        return pickle.loads(row[5])
+
+    def put(
+        self, file_path: Path, is_dependency: bool, result: Any,
+        sha256: Optional[str] = None, stat: Optional[os.stat_result] = None,
+    ):
+        """
+        Stores the result computed from `file_path`. A caller that already hashed
+        the contents passes `sha256` so the file is not read again, and `stat` as
+        taken before the file was read: if it has been saved since, the result is
+        stale and nothing is stored.
+        """
+        try:
+            current = file_path.stat()
+            if stat is not None and (stat.st_mtime_ns, stat.st_size) != (current.st_mtime_ns, current.st_size):
+                return
+            stat = current
+            sha256 = sha256 or self._sha256(file_path)
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            self._check_owner()
+            with self._lock:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(file_path), self.version, int(is_dependency), stat.st_mtime_ns, stat.st_size, sha256, payload),
+                )
+                self.conn.commit()
+        except Exception as e:
+            logger.warning(f"Parse cache write failed for {file_path}: {e}")
+
+def open_parse_cache(version: str, table: str = "parse_cache") -> Optional[ParseCache]:
+    """Opens `table` in the configured cache, or returns None if it is disabled or unusable."""
+    setting = os.getenv("CGC_PARSE_CACHE", "")
+    if setting.lower() in ("0", "off", "false", "no"):
+        return None
+    try:
+        return ParseCache(Path(setting) if setting else DEFAULT_CACHE_PATH, version, table)
+    except Exception as e:
+        logger.warning(f"Parse cache disabled: {e}")
+        return None
@@ -0,0 +1,96 @@
+import mmap
+import os
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, Tuple, Union
+
+# How many files may be read ahead of the consumer. Bounding the window keeps
+# memory flat on large repositories while still hiding disk latency.
+PREFETCH_WINDOW = 2 * (os.cpu_count() or 1)
+
+# Directories that never hold project sources (VCS metadata, virtualenvs and
+# tool caches); they are pruned at any depth without being entered.
+SKIP_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv', '.tox',
+    '.mypy_cache', '.pytest_cache',
+})
+
+# Build output of the project being indexed. Only pruned directly under the root:
+# deeper down these names are ordinary packages (e.g. `pip/_internal/operations/build`).
+BUILD_OUTPUT_DIRS = frozenset({'build', 'dist'})
+
+def iter_source_files(
+    root: Path, extensions: Collection[str], recursive: bool = True, skip_build_output: bool = True
+) -> Iterator[Path]:
+    """
+    Lazily yield the files under `root` whose suffix is in `extensions`, walking the
+    tree with `os.scandir` and skipping `SKIP_DIRS`, plus `BUILD_OUTPUT_DIRS` at the top
+    level when `skip_build_output` is set. With `recursive=False` only the top level
+    of `root` is listed. A file `root` is yielded as-is when its suffix matches.
+    """
+    if not root.is_dir():
+        if root.suffix in extensions:
+            yield root
+        return
+
+    top_skip_dirs = SKIP_DIRS | BUILD_OUTPUT_DIRS if skip_build_output else SKIP_DIRS
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        skip_dirs = top_skip_dirs if directory == str(root) else SKIP_DIRS
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and entry.name not in skip_dirs:
+                                stack.append(entry.path)
+                        elif os.path.splitext(entry.name)[1] in extensions and entry.is_file():
+                            yield Path(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+# Sources larger than this are memory-mapped rather than copied into a bytes object.
+MMAP_THRESHOLD = 64 * 1024
+
+@contextmanager
+def open_source(path: Union[str, Path]) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Yields the contents of `path` as a bytes-like object for `ast.parse` or a
+    tree-sitter parser. Large files are memory-mapped read-only, so they are read
+    from the page cache without an extra copy; the mapping is closed on exit.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+def _read_source(path: Path) -> Union[bytes, Exception]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except Exception as e:
+        return e
+
+def prefetch_sources(paths: Iterable[Path], window: int = PREFETCH_WINDOW) -> Iterator[Tuple[Path, Union[bytes, Exception]]]:
+    """
+    Yield `(path, source_bytes)` pairs in input order, reading the next files on a
+    thread pool while the caller parses the current one. A failed read yields the
+    exception in place of the bytes so the caller can log it and move on.
+    """
+    with ThreadPoolExecutor(max_workers=min(window, 8)) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append((path, pool.submit(_read_source, path)))
+            if len(pending) >= window:
+                head_path, future = pending.popleft()
+                yield head_path, future.result()
+        while pending:
+            head_path, future = pending.popleft()
+            yield head_path, future.result()
@@ -0,0 +1,388 @@
+import asyncio
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from codegraphcontext.core.jobs import JobManager, JobStatus
+from codegraphcontext.tools.graph_builder import (
+    CALLS_FROM_FILE_QUERY,
+    CALLS_FROM_FUNCTION_QUERY,
+    DIRECTORY_CHAIN_QUERY,
+    FILE_CONTAINS_QUERIES,
+    FULLTEXT_INDEX_STATEMENT,
+    ITEM_MERGE_QUERIES,
+    SCHEMA_STATEMENTS,
+    UNCHANGED_FILES_QUERY,
+    GraphBuilder,
+)
+
+# ==============================================================================
+# == IN-MEMORY NEO4J STAND-INS
+# ==============================================================================
+
+class FakeResult:
+    def __init__(self, records=()):
+        self.records = list(records)
+
+    def single(self):
+        return self.records[0] if self.records else None
+
+    def consume(self):
+        return None
+
+    def __iter__(self):
+        return iter(self.records)
+
+class FakeTx:
+    """Records every Cypher statement with its parameters; `responder` supplies results."""
+
+    def __init__(self, log, responder=None):
+        self.log = log
+        self.responder = responder
+
+    def run(self, query, parameters=None, **kwargs):
+        params = dict(parameters or {}, **kwargs)
+        self.log.append((query, params))
+        records = self.responder(query, params) if self.responder else ()
+        return FakeResult(records or ())
+
+class FakeSession(FakeTx):
+    def execute_write(self, fn, *args, **kwargs):
+        # Statements are only logged once their transaction commits; a raise rolls them back.
+        tx_log = []
+        result = fn(FakeTx(tx_log, self.responder), *args, **kwargs)
+        self.log.extend(tx_log)
+        return result
+
+    execute_read = execute_write
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class FakeDriver:
+    def __init__(self, responder=None):
+        self.log = []
+        self.responder = responder
+
+    def session(self, **kwargs):
+        return FakeSession(self.log, self.responder)
+
+class FakeDatabaseManager:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def get_driver(self):
+        return self.driver
+
+@pytest.fixture
+def builder(monkeypatch):
+    # Keep parse results out of the user's on-disk cache.
+    monkeypatch.setenv("CGC_PARSE_CACHE", "off")
+    builder = GraphBuilder(FakeDatabaseManager(FakeDriver()), job_manager=None, loop=None)
+    yield builder
+    if builder._parse_pool is not None:
+        builder._parse_pool.shutdown(cancel_futures=True)
+
+# ==============================================================================
+# == SCHEMA
+# ==============================================================================
+
+def _rejecting(*statements):
+    def responder(query, params):
+        if query in statements:
+            raise RuntimeError("Invalid input")
+    return responder
+
+def test_schema_is_created_in_one_transaction():
+    driver = FakeDriver()
+    GraphBuilder(FakeDatabaseManager(driver), job_manager=None, loop=None)
+    assert [query for query, _ in driver.log] == [*SCHEMA_STATEMENTS, FULLTEXT_INDEX_STATEMENT]
+
+def test_unsupported_fulltext_index_keeps_the_constraints():
+    driver = FakeDriver(_rejecting(FULLTEXT_INDEX_STATEMENT))
+    GraphBuilder(FakeDatabaseManager(driver), job_manager=None, loop=None)
+    assert [query for query, _ in driver.log] == list(SCHEMA_STATEMENTS)
+
+def test_failing_statement_keeps_the_others():
+    bad = SCHEMA_STATEMENTS[3]
+    driver = FakeDriver(_rejecting(bad))
+    GraphBuilder(FakeDatabaseManager(driver), job_manager=None, loop=None)
+    committed = [query for query, _ in driver.log]
+    assert committed == [q for q in SCHEMA_STATEMENTS if q != bad] + [FULLTEXT_INDEX_STATEMENT]
+
+# ==============================================================================
+# == PARSE POOL
+# ==============================================================================
+
+def test_broken_parse_pool_is_replaced(builder, tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text("def foo():\n    pass\n")
+
+    pool = builder._get_parse_pool()
+    # A worker dying abruptly breaks the whole executor.
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+    with pytest.raises(BrokenProcessPool):
+        list(builder.parse_files_parallel(tmp_path, [source]))
+
+    assert builder._get_parse_pool() is not pool
+    parsed = list(builder.parse_files_parallel(tmp_path, [source]))
+    assert [f["name"] for f in parsed[0]["functions"]] == ["foo"]
+
+# ==============================================================================
+# == UNCHANGED FILES
+# ==============================================================================
+
+def _file_data(path):
+    return {
+        "file_path": str(path),
+        "content_sha": "abc",
+        "is_dependency": False,
+        "lang": "python",
+        "functions": [{"name": "foo", "line_number": 1, "args": ["x"]}],
+        "classes": [],
+        "variables": [],
+        "imports": [],
+        "function_calls": [],
+    }
+
+def _unchanged_responder(query, params):
+    if query == UNCHANGED_FILES_QUERY:
+        return [{"path": f["path"]} for f in params["files"]]
+    return ()
+
+def test_unchanged_file_is_attached_under_a_new_root(tmp_path):
+    # The file was indexed as part of `repo`; now its parent directory is indexed.
+    driver = FakeDriver(_unchanged_responder)
+    builder = GraphBuilder(FakeDatabaseManager(driver), job_manager=None, loop=None)
+    file_path = tmp_path / "repo" / "pkg" / "module.py"
+    driver.log.clear()
+
+    builder.add_files_to_graph([_file_data(file_path)], tmp_path.name, tmp_path, imports_map={})
+
+    queries = [query for query, _ in driver.log]
+    file_merge = next(params for query, params in driver.log if "MERGE (n:File" in query)
+    assert file_merge["relative_path"] == str(file_path.relative_to(tmp_path))
+
+    dirs = next(params["dirs"] for query, params in driver.log if query == DIRECTORY_CHAIN_QUERY)
+    assert [row["path"] for row in dirs] == [str(tmp_path / "repo"), str(tmp_path / "repo" / "pkg")]
+    assert FILE_CONTAINS_QUERIES["Directory"] in queries
+
+    # The item subgraph is already up to date and is not rewritten.
+    assert not set(queries) & set(ITEM_MERGE_QUERIES.values())
+    assert not any("HAS_PARAMETER" in query for query in queries)
+
+def test_changed_file_writes_its_items(tmp_path):
+    driver = FakeDriver()
+    builder = GraphBuilder(FakeDatabaseManager(driver), job_manager=None, loop=None)
+
+    builder.add_files_to_graph([_file_data(tmp_path / "module.py")], tmp_path.name, tmp_path, imports_map={})
+
+    queries = [query for query, _ in driver.log]
+    assert ITEM_MERGE_QUERIES["Function", False] in queries
+    assert any("HAS_PARAMETER" in query for query in queries)
+
+# ==============================================================================
+# == BUILD FAILURE PATH
+# ==============================================================================
+
+class FailingJobManager(JobManager):
+    """Fails the build once the second file is counted, while the first is being written."""
+
+    def __init__(self, write_started):
+        super().__init__()
+        self.write_started = write_started
+
+    def update_job(self, job_id, **kwargs):
+        if kwargs.get("processed_files", 0) >= 2 and self.write_started.wait(5):
+            raise RuntimeError("progress update failed")
+        super().update_job(job_id, **kwargs)
+
+def test_failed_build_waits_for_the_write_in_flight(builder, tmp_path):
+    for name in ("a.py", "b.py"):
+        (tmp_path / name).write_text("def foo():\n    pass\n")
+
+    write_started, write_finished = threading.Event(), threading.Event()
+    def slow_write(*args, **kwargs):
+        write_started.set()
+        time.sleep(0.5)
+        write_finished.set()
+
+    builder.job_manager = FailingJobManager(write_started)
+    builder.add_files_to_graph = slow_write
+    job_id = builder.job_manager.create_job(str(tmp_path))
+
+    async def build():
+        await builder.build_graph_from_path_async(tmp_path, job_id=job_id)
+        # Checked before asyncio.run shuts down the thread pool and joins the writer.
+        return write_finished.is_set()
+
+    # The build only returned, closing its session, after the batch was written.
+    assert asyncio.run(build())
+    job = builder.job_manager.get_job(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.errors == ["progress update failed"]
+
+def test_writer_error_fails_the_build(builder, tmp_path):
+    (tmp_path / "a.py").write_text("def foo():\n    pass\n")
+    def failing_write(*args, **kwargs):
+        raise RuntimeError("db down")
+
+    builder.job_manager = JobManager()
+    builder.add_files_to_graph = failing_write
+    job_id = builder.job_manager.create_job(str(tmp_path))
+
+    asyncio.run(builder.build_graph_from_path_async(tmp_path, job_id=job_id))
+
+    job = builder.job_manager.get_job(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.errors == ["db down"]
+
+# ==============================================================================
+# == CALLS RELATIONSHIPS
+# ==============================================================================
+
+class CallsGraph:
+    """
+    Responder that applies the CALLS queries to an in-memory edge set. Nodes and
+    edges are keyed on exactly the `row.*` fields the query's MATCH and MERGE
+    patterns name, and the `SET r.x = row.y` clauses update the merged edge.
+    """
+
+    def __init__(self):
+        self.edges = {}
+
+    def __call__(self, query, params):
+        if query not in (CALLS_FROM_FUNCTION_QUERY, CALLS_FROM_FILE_QUERY):
+            return ()
+        patterns = re.findall(r"MATCH \(\w+:\w+ \{(.*?)\}\)", query)
+        patterns.append(re.search(r"\[r:CALLS \{(.*?)\}\]", query).group(1))
+        key_fields = [re.findall(r"row\.(\w+)", pattern) for pattern in patterns]
+        updates = re.findall(r"SET r\.(\w+) = row\.(\w+)", query)
+        for row in params["rows"]:
+            key = tuple(tuple(row[field] for field in fields) for fields in key_fields)
+            edge = self.edges.setdefault(key, {})
+            edge.update({prop: row[field] for prop, field in updates})
+        return ()
+
+def _calling_file(path, calls):
+    return {
+        "file_path": str(path),
+        "functions": [{"name": "main", "line_number": 1}, {"name": "helper", "line_number": 5}],
+        "imports": [],
+        "function_calls": [
+            {"name": "helper", "full_name": "helper", "line_number": line, "args": args,
+             "context": ("main", "function_definition", 1)}
+            for line, args in calls
+        ],
+    }
+
+def test_reindexing_a_call_updates_its_edge(tmp_path):
+    graph = CallsGraph()
+    builder = GraphBuilder(FakeDatabaseManager(FakeDriver(graph)), job_manager=None, loop=None)
+    path = tmp_path / "module.py"
+
+    builder._create_all_function_calls([_calling_file(path, [(2, ["x"])])], imports_map={})
+    # Same call site, args extracted in a different format.
+    builder._create_all_function_calls([_calling_file(path, [(2, ["x=1"])])], imports_map={})
+    assert list(graph.edges.values()) == [{"args": ["x=1"]}]
+
+    # A second call to the same function on another line is its own edge.
+    builder._create_all_function_calls([_calling_file(path, [(2, ["x=1"]), (3, [])])], imports_map={})
+    assert sorted(edge["args"] for edge in graph.edges.values()) == [[], ["x=1"]]
+
+# ==============================================================================
+# == DELETING FILES
+# ==============================================================================
+
+def test_delete_file_runs_one_statement_on_the_resolved_path(tmp_path, monkeypatch):
+    driver = FakeDriver()
+    builder = GraphBuilder(FakeDatabaseManager(driver), job_manager=None, loop=None)
+    builder._created_dirs.add(str(tmp_path / "pkg"))
+    driver.log.clear()
+    monkeypatch.chdir(tmp_path)
+
+    builder.delete_file_from_graph("pkg/module.py")
+
+    [(query, params)] = driver.log
+    assert "DETACH DELETE" in query
+    assert params == {"path": str(tmp_path / "pkg" / "module.py")}
+    # Directories may have been deleted, so none are assumed to exist any more.
+    assert not builder._created_dirs
+
+@pytest.fixture
+def neo4j_driver():
+    """A driver for the Neo4j named by NEO4J_URI; tests using it are skipped without one."""
+    if not os.getenv("NEO4J_URI"):
+        pytest.skip("NEO4J_URI is not set")
+    from neo4j import GraphDatabase
+    driver = GraphDatabase.driver(
+        os.environ["NEO4J_URI"],
+        auth=(os.getenv("NEO4J_USERNAME", "neo4j"), os.getenv("NEO4J_PASSWORD")),
+    )
+    yield driver
+    driver.close()
+
+def test_delete_file_removes_only_emptied_directories(neo4j_driver):
+    root = f"/cgc-test-{uuid.uuid4()}"
+    with neo4j_driver.session() as session:
+        session.run("""
+            CREATE (r:Repository {path: $root})
+            CREATE (a:Directory {path: $root + '/a'})
+            CREATE (b:Directory {path: $root + '/a/b'})
+            CREATE (c:Directory {path: $root + '/a/b/c'})
+            CREATE (x:File {path: $root + '/a/b/c/x.py'})
+            CREATE (y:File {path: $root + '/a/y.py'})
+            CREATE (fn:Function {name: 'f', file_path: $root + '/a/b/c/x.py', line_number: 1})
+            CREATE (r)-[:CONTAINS]->(a), (a)-[:CONTAINS]->(b), (b)-[:CONTAINS]->(c),
+                   (c)-[:CONTAINS]->(x), (a)-[:CONTAINS]->(y), (x)-[:CONTAINS]->(fn)
+        """, root=root).consume()
+
+    builder = GraphBuilder(FakeDatabaseManager(neo4j_driver), job_manager=None, loop=None)
+    try:
+        builder.delete_file_from_graph(root + "/a/b/c/x.py")
+
+        with neo4j_driver.session() as session:
+            remaining = session.run("""
+                MATCH (n) WHERE n.path STARTS WITH $root OR n.file_path STARTS WITH $root
+                RETURN collect(coalesce(n.path, n.file_path)) AS paths
+            """, root=root).single()["paths"]
+        # `a` still holds y.py; `b` and `c` only led to the deleted file.
+        assert sorted(remaining) == [root, root + "/a", root + "/a/y.py"]
+    finally:
+        with neo4j_driver.session() as session:
+            session.run("""
+                MATCH (n) WHERE n.path STARTS WITH $root OR n.file_path STARTS WITH $root
+                DETACH DELETE n
+            """, root=root).consume()
+
+def test_reindexing_a_call_updates_its_edge_in_neo4j(neo4j_driver):
+    file_path = f"/cgc-test-{uuid.uuid4()}/module.py"
+    with neo4j_driver.session() as session:
+        session.run("""
+            CREATE (:Function {name: 'main', file_path: $path, line_number: 1})
+            CREATE (:Function {name: 'helper', file_path: $path, line_number: 5})
+        """, path=file_path).consume()
+
+    builder = GraphBuilder(FakeDatabaseManager(neo4j_driver), job_manager=None, loop=None)
+    try:
+        builder._create_all_function_calls([_calling_file(file_path, [(2, ["x"])])], imports_map={})
+        builder._create_all_function_calls([_calling_file(file_path, [(2, ["x=1"])])], imports_map={})
+
+        with neo4j_driver.session() as session:
+            args = session.run("""
+                MATCH (:Function {file_path: $path})-[r:CALLS]->(:Function {file_path: $path})
+                RETURN collect(r.args) AS args
+            """, path=file_path).single()["args"]
+        assert args == [["x=1"]]
+    finally:
+        with neo4j_driver.session() as session:
+            session.run("MATCH (n:Function {file_path: $path}) DETACH DELETE n", path=file_path).consume()
@@ -0,0 +1,130 @@
+import ast
+import textwrap
+
+import pytest
+
+from codegraphcontext.tools import import_extractor
+from codegraphcontext.tools.import_extractor import ImportExtractor, _iter_header_statements
+
+@pytest.fixture(autouse=True)
+def no_imports_cache(monkeypatch):
+    # False marks the on-disk cache as unavailable, so every file is parsed.
+    monkeypatch.setattr(import_extractor, "_imports_cache", False)
+
+def _header_imports(source):
+    tree = ast.parse(textwrap.dedent(source))
+    return sorted(
+        alias.name
+        for node in _iter_header_statements(tree)
+        if isinstance(node, ast.Import)
+        for alias in node.names
+    )
+
+# ==============================================================================
+# == PYTHON IMPORT HEADER
+# ==============================================================================
+
+def test_header_includes_docstring_all_and_import_guards():
+    assert _header_imports('''
+        """Module docstring."""
+        import a
+        __all__ = ["x"]
+        try:
+            import b
+        except ImportError:
+            import c
+        if TYPE_CHECKING:
+            import d
+        import e
+        def f():
+            import g
+    ''') == ["a", "b", "c", "d", "e"]
+
+def test_header_ends_at_a_call():
+    assert _header_imports('''
+        import a
+        sys.path.insert(0, "lib")
+        import b
+    ''') == ["a"]
+
+def test_header_ends_at_a_guard_that_runs_code():
+    assert _header_imports('''
+        import a
+        if __name__ == "__main__":
+            main()
+        import b
+    ''') == ["a"]
+
+def test_header_ends_at_a_try_that_runs_code():
+    assert _header_imports('''
+        import a
+        try:
+            import b
+            configure()
+        except ImportError:
+            pass
+        import c
+    ''') == ["a"]
+
+def test_header_only_mode(monkeypatch, tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("import a\nmain()\nimport b\n")
+    assert ImportExtractor.extract_python_imports(str(path)) == {"a", "b"}
+
+    monkeypatch.setattr(import_extractor, "HEADER_IMPORTS_ONLY", True)
+    assert ImportExtractor.extract_python_imports(str(path)) == {"a"}
+
+def test_list_imports_dispatches_by_language(tmp_path):
+    (tmp_path / "module.py").write_text("import requests\nimport os\n")
+    (tmp_path / "module.js").write_text("import React from 'react';\n")
+
+    extractor = ImportExtractor()
+    assert extractor.list_imports_tool(str(tmp_path), "python")["imports"] == ["requests"]
+    assert extractor.list_imports_tool(str(tmp_path), "javascript")["imports"] == ["react"]
+
+# ==============================================================================
+# == TREE-SITTER IMPORTS (JAVASCRIPT, TYPESCRIPT, JAVA)
+# ==============================================================================
+
+def _write(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(textwrap.dedent(source))
+    return str(path)
+
+def test_javascript_imports(tmp_path):
+    path = _write(tmp_path, "module.js", """
+        import React from 'react';
+        import { x } from "./local";
+        export * from '@scope/pkg/sub';
+        const lazy = import('dyn');
+        const fp = require('lodash/fp');
+        // import fake from 'commented-out';
+        const text = "import fake from 'in-a-string'";
+    """)
+    assert ImportExtractor.extract_javascript_imports(path) == {"react", "@scope/pkg", "dyn", "lodash"}
+
+def test_only_calls_to_require_count_as_imports(tmp_path):
+    path = _write(tmp_path, "module.js", """
+        const a = require('kept');
+        const b = notrequire('plain-call');
+        const c = loader.require('member-call');
+        const d = require(name, 'second-argument');
+    """)
+    assert ImportExtractor.extract_javascript_imports(path) == {"kept"}
+
+def test_typescript_import_equals_require(tmp_path):
+    path = _write(tmp_path, "module.ts", """
+        import fs = require('fs');
+        import type { T } from 'types-only';
+    """)
+    assert ImportExtractor.extract_javascript_imports(path) == {"fs", "types-only"}
+
+def test_java_static_and_wildcard_imports(tmp_path):
+    path = _write(tmp_path, "A.java", """
+        package p;
+        import static org.junit.Assert.assertEquals;
+        import java.util.*;
+        import com.google.common.collect.ImmutableList;
+        class A {}
+    """)
+    assert ImportExtractor.extract_java_imports(path) == {"org.junit", "java.util", "com.google"}
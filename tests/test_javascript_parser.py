@@ -0,0 +1,107 @@
+import pytest
+
+from codegraphcontext.tools.graph_builder import TreeSitterParser
+
+@pytest.fixture(scope="module")
+def js_parser():
+    return TreeSitterParser("javascript")
+
+@pytest.fixture
+def parse_js(js_parser, tmp_path):
+    def parse(source, is_dependency=False):
+        path = tmp_path / "module.js"
+        path.write_text(source)
+        return js_parser.parse(path, is_dependency)
+    return parse
+
+def _docstrings(file_data):
+    return {f["name"]: f["docstring"] for f in file_data["functions"]}
+
+# ==============================================================================
+# == JSDOC COMMENTS
+# ==============================================================================
+
+def test_jsdoc_directly_before_function(parse_js):
+    docs = _docstrings(parse_js("/**\n * Adds.\n */\nfunction add(a, b) {}\n"))
+    assert docs == {"add": "/**\n * Adds.\n */"}
+
+def test_jsdoc_before_method(parse_js):
+    docs = _docstrings(parse_js("class K {\n  /** Runs. */\n  run() {}\n}\n"))
+    assert docs == {"run": "/** Runs. */"}
+
+def test_line_comments_between_jsdoc_and_function_are_skipped(parse_js):
+    docs = _docstrings(parse_js("/** Doc. */\n// see a */ b\nfunction f() {}\n"))
+    assert docs == {"f": "/** Doc. */"}
+
+def test_plain_block_comments_between_jsdoc_and_function_are_skipped(parse_js):
+    docs = _docstrings(parse_js("/** Doc. */ /* eslint-disable */ function f() {}\n"))
+    assert docs == {"f": "/** Doc. */"}
+    docs = _docstrings(parse_js("/** Doc. */\n/*\n * plain\n */\n// note\nfunction g() {}\n"))
+    assert docs == {"g": "/** Doc. */"}
+
+def test_block_end_inside_trailing_line_comment_is_not_jsdoc(parse_js):
+    docs = _docstrings(parse_js("/** Stale. */\nfoo(); // x */\nfunction f() {}\n"))
+    assert docs == {"f": None}
+
+def test_plain_block_comment_is_not_jsdoc(parse_js):
+    docs = _docstrings(parse_js("/** Earlier. */\nlet x = 1;\n/* plain */\nfunction f() {}\n"))
+    assert docs == {"f": None}
+
+def test_code_between_jsdoc_and_function(parse_js):
+    docs = _docstrings(parse_js("/** Doc. */\nconst f = function () {};\n"))
+    assert docs == {"f": None}
+
+def test_dependency_files_skip_jsdoc(parse_js):
+    docs = _docstrings(parse_js("/** Doc. */\nfunction f() {}\n", is_dependency=True))
+    assert docs == {"f": None}
+
+# ==============================================================================
+# == FUNCTION CAPTURE GROUPING
+# ==============================================================================
+
+def _signatures(file_data):
+    return {(f["name"], f["line_number"]): list(f["args"]) for f in file_data["functions"]}
+
+def test_captures_are_grouped_by_their_function(parse_js):
+    functions = _signatures(parse_js(
+        "function decl(a, b = 1) {}\n"
+        "const expr = function (c) {};\n"
+        "const arrow = (d, e) => d + e;\n"
+        "const single = f => f;\n"
+        "obj.assigned = function (g) {};\n"
+        "obj.assignedArrow = (h) => h;\n"
+        "class K {\n"
+        "  method(i) {}\n"
+        "}\n"
+    ))
+    assert functions == {
+        ("decl", 1): ["a", "b"],
+        ("expr", 2): ["c"],
+        ("arrow", 3): ["d", "e"],
+        ("single", 4): ["f"],
+        ("assigned", 5): ["g"],
+        ("assignedArrow", 6): ["h"],
+        ("method", 8): ["i"],
+    }
+
+def test_nested_functions_keep_their_own_parameters(parse_js):
+    functions = _signatures(parse_js(
+        "function outer(a) {\n"
+        "  function inner(b) {}\n"
+        "  const cb = (c) => c;\n"
+        "}\n"
+    ))
+    assert functions == {("outer", 1): ["a"], ("inner", 2): ["b"], ("cb", 3): ["c"]}
+
+def test_functions_with_the_same_name_stay_separate(parse_js):
+    functions = _signatures(parse_js(
+        "class A {\n  run(x) {}\n}\n"
+        "class B {\n  run(y, z) {}\n}\n"
+    ))
+    assert functions == {("run", 2): ["x"], ("run", 5): ["y", "z"]}
+
+def test_method_context_is_its_class(parse_js):
+    file_data = parse_js("class K {\n  run() {}\n}\n")
+    [method] = file_data["functions"]
+    assert method["class_context"] == "K"
+    assert method["context_type"] == "class_declaration"
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from codegraphcontext.tools.graph_builder import PARSE_POOL_CONTEXT
+from codegraphcontext.utils.parse_cache import SCHEMA_VERSION, ParseCache
+
+RESULT = {"functions": [{"name": "foo", "line_number": 1}]}
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("def foo():\n    pass\n")
+    return path
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "cache" / "parse_cache.sqlite3"
+
+def test_unchanged_file_is_a_hit(db_path, source_file):
+    cache = ParseCache(db_path, "v1")
+    assert cache.get(source_file) is None
+    cache.put(source_file, False, RESULT)
+    assert cache.get(source_file) == RESULT
+
+def test_dependency_flag_must_match(db_path, source_file):
+    cache = ParseCache(db_path, "v1")
+    cache.put(source_file, False, RESULT)
+    assert cache.get(source_file, is_dependency=True) is None
+
+def test_touched_file_with_same_content_is_a_hit(db_path, source_file):
+    cache = ParseCache(db_path, "v1")
+    cache.put(source_file, False, RESULT)
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    assert cache.get(source_file) == RESULT
+
+def test_changed_content_is_a_miss(db_path, source_file):
+    cache = ParseCache(db_path, "v1")
+    cache.put(source_file, False, RESULT)
+    stat = source_file.stat()
+    # Same size, different bytes, different mtime: the hash must decide.
+    source_file.write_text("def bar():\n    pass\n")
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    assert cache.get(source_file) is None
+
+def test_file_saved_while_parsing_is_not_stored(db_path, source_file):
+    cache = ParseCache(db_path, "v1")
+    stat_before_read = source_file.stat()
+    source_file.write_text("def foo():\n    return 1\n")
+    os.utime(source_file, ns=(stat_before_read.st_atime_ns, stat_before_read.st_mtime_ns + 5_000_000_000))
+    cache.put(source_file, False, RESULT, stat=stat_before_read)
+    assert cache.get(source_file) is None
+
+def test_parser_version_mismatch_is_a_miss(db_path, source_file):
+    ParseCache(db_path, "v1").put(source_file, False, RESULT)
+    assert ParseCache(db_path, "v2").get(source_file) is None
+    assert ParseCache(db_path, "v1").get(source_file) == RESULT
+
+def test_other_schema_version_is_reset(db_path, source_file):
+    ParseCache(db_path, "v1").put(source_file, False, RESULT)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+    conn.commit()
+    conn.close()
+
+    cache = ParseCache(db_path, "v1")
+    assert cache.get(source_file) is None
+    assert cache.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_opens_its_own_connection(db_path, source_file):
+    cache = ParseCache(db_path, "v1")
+    cache.put(source_file, False, RESULT)
+    parent_conn = cache.conn
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = cache.get(source_file) == RESULT and cache.conn is not parent_conn
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    os.close(read_fd)
+    assert cache.conn is parent_conn
+    assert cache.get(source_file) == RESULT
+
+def _open_and_write(db_path, source_file, table):
+    cache = ParseCache(db_path, "v1", table)
+    cache.put(source_file, False, RESULT)
+    return cache.get(source_file) == RESULT
+
+def test_concurrent_opens_migrate_once(db_path, source_file):
+    ParseCache(db_path, "v1").put(source_file, False, RESULT)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+    conn.commit()
+    conn.close()
+
+    tables = [f"table_{i}" for i in range(8)]
+    # Started like the parse workers: SQLite state forked from this process is unsafe to reuse.
+    with ProcessPoolExecutor(max_workers=len(tables), mp_context=PARSE_POOL_CONTEXT) as pool:
+        results = list(pool.map(_open_and_write, [db_path] * len(tables), [source_file] * len(tables), tables))
+    assert all(results)
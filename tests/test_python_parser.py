@@ -0,0 +1,70 @@
+import textwrap
+
+import pytest
+
+from codegraphcontext.tools.graph_builder import TreeSitterParser
+
+@pytest.fixture(scope="module")
+def py_parser():
+    return TreeSitterParser("python")
+
+@pytest.fixture
+def complexities(py_parser, tmp_path):
+    def parse(source):
+        path = tmp_path / "module.py"
+        path.write_text(textwrap.dedent(source))
+        return {
+            (f["name"], f["line_number"]): f["cyclomatic_complexity"]
+            for f in py_parser.parse(path)["functions"]
+        }
+    return parse
+
+# ==============================================================================
+# == CYCLOMATIC COMPLEXITY
+# ==============================================================================
+
+def test_straight_line_function(complexities):
+    assert complexities("""
+        def f():
+            return 1
+    """) == {("f", 2): 1}
+
+def test_each_decision_point_counts(complexities):
+    assert complexities("""
+        def f(items):
+            for item in items:
+                if item and item.ok:
+                    return [x for x in item]
+            while False:
+                pass
+    """) == {("f", 2): 6}
+
+def test_nested_function_counts_towards_its_enclosing_function(complexities):
+    assert complexities("""
+        def outer(a):
+            if a:
+                pass
+            def inner(b):
+                if b:
+                    pass
+                for _ in b:
+                    pass
+            return inner
+    """) == {("outer", 2): 4, ("inner", 5): 3}
+
+def test_sibling_functions_are_counted_separately(complexities):
+    assert complexities("""
+        class K:
+            def a(self, x):
+                if x:
+                    pass
+
+            def b(self):
+                return 0
+
+        def c(y):
+            try:
+                pass
+            except ValueError:
+                pass
+    """) == {("a", 3): 2, ("b", 7): 1, ("c", 10): 2}
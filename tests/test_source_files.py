@@ -0,0 +1,21 @@
+from codegraphcontext.utils.source_files import iter_source_files
+
+def _tree(tmp_path, *paths):
+    for path in paths:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+
+def _found(tmp_path, **kwargs):
+    return sorted(str(p.relative_to(tmp_path)) for p in iter_source_files(tmp_path, {".py"}, **kwargs))
+
+def test_build_output_is_skipped_only_at_the_root(tmp_path):
+    _tree(tmp_path, "build/lib/a.py", "dist/b.py", "pkg/build/c.py", "pkg/dist/d.py", "pkg/e.py")
+    assert _found(tmp_path) == ["pkg/build/c.py", "pkg/dist/d.py", "pkg/e.py"]
+
+def test_build_output_is_kept_when_not_skipped(tmp_path):
+    _tree(tmp_path, "build/a.py", "pkg/b.py")
+    assert _found(tmp_path, skip_build_output=False) == ["build/a.py", "pkg/b.py"]
+
+def test_tool_directories_are_skipped_at_any_depth(tmp_path):
+    _tree(tmp_path, ".git/a.py", "pkg/__pycache__/b.py", "pkg/.venv/c.py", "pkg/d.py")
+    assert _found(tmp_path) == ["pkg/d.py"]